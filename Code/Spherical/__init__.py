@@ -4,5 +4,6 @@
 import os
 
 from .asciitable  import ASCIItable       # noqa
-from .orientation import Quaternion, Rodrigues, Symmetry, Orientation # noqa
+from .orientation import Quaternion, QuaternionArray, Rodrigues, Symmetry, Orientation, OrientationArray # noqa
 from .util        import extendableOption # noqa
+from .discretization import discretize, GridCache # noqa
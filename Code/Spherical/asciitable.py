@@ -2,8 +2,12 @@
 
 # obtained from https://damask.mpie.de #
 
-import os,sys
+import os,sys,shlex,threading
 import numpy as np
+try:
+  import queue
+except(ImportError):
+  import Queue as queue
 
 # ------------------------------------------------------------------
 # python 3 has no unicode object, this ensures that the code works on Python 2&3
@@ -23,6 +27,8 @@ class ASCIItable():
               ]
 
   tmpext = '_tmp'                                                                                   # filename extension for in-place access
+  binaryMagic = 'ASCIItable binary'                                                                 # first line of binary (columnar) tables
+  binaryAlign = 64                                                                                  # byte alignment of binary data
   
 # ------------------------------------------------------------------
   def __init__(self,
@@ -31,13 +37,23 @@ class ASCIItable():
                buffered  = False,                                                                   # flush writes
                labeled   = True,                                                                    # assume table has labels
                readonly  = False,                                                                   # no reading from file
+               numeric   = False,                                                                   # data consists of numbers only
+               bufferRows  = 0,                                                                     # flush writes once this many rows are buffered
+               bufferBytes = 0,                                                                     # flush writes once this many bytes are buffered
+               threaded  = False,                                                                   # write to file in background thread
               ):
     self.__IO__ = {'output': [],
-                   'buffered': buffered,
+                   'buffered': buffered or bufferRows > 0 or bufferBytes > 0,
+                   'bufferLimits': (bufferRows,bufferBytes),
+                   'outputBytes': 0,
+                   'writer': None,                                                                  # background writer thread
                    'labeled':  labeled,                                                             # header contains labels
+                   'numeric':  numeric,                                                             # parse data straight to floats
                    'tags': [],                                                                      # labels according to file info
                    'readBuffer': [],                                                                # buffer to hold non-advancing reads
                    'dataStart': 0,
+                   'binary': None,                                                                  # memory map of binary data (columns x rows)
+                   'row': 0,                                                                        # next row to read from binary data
                   }
 
     self.__IO__['inPlace'] = not outname and name and not readonly
@@ -65,6 +81,13 @@ class ASCIItable():
 
     if   self.__IO__['in']  is None \
       or self.__IO__['out'] is None: raise IOError                                                 # complain if any required file access not possible
+
+    if threaded:
+      self.__IO__['writeQueue'] = queue.Queue(maxsize = 4)                                          # bounds memory held by pending writes
+      self.__IO__['writeError'] = None                                                              # first exception raised in background writer
+      self.__IO__['writer'] = threading.Thread(target = self._writer)
+      self.__IO__['writer'].daemon = True
+      self.__IO__['writer'].start()
      
 # ------------------------------------------------------------------
   def _transliterateToFloat(self,
@@ -83,21 +106,33 @@ class ASCIItable():
       return string
 
 
+# ------------------------------------------------------------------
+  def _tokenize(self,
+                line):
+    """split line into items, resorting to (slow) shlex only if quotes or escapes need to be handled"""
+    if '"' in line or "'" in line or '\\' in line or '\x0b' in line or '\x0c' in line:              # plain split differs from shlex only for these
+      return shlex.split(line)
+    else:
+      return line.split()
+
 # ------------------------------------------------------------------
   def _quote(self,
              what):
     """quote empty or white space-containing output"""
-    import re
-    
+    if isinstance(what, float) and (self.__IO__['numeric'] or self.__IO__['binary'] is not None):
+      return repr(what)                                                                             # numbers of numeric or binary tables keep full precision
+
+    text = what if isinstance(what, str) else str(what)
     return '{quote}{content}{quote}'.format(
-             quote   = ('"' if str(what)=='' or re.search(r"\s",str(what)) else ''),
+             quote   = ('"' if text.split() != [text] else ''),                                     # empty or containing white space
              content = what)
 # ------------------------------------------------------------------
   def close(self,
             dismiss = False):
     self.input_close()
-    self.output_flush()
+    flushed = self.output_flush()
     self.output_close(dismiss)
+    return flushed
 
 # ------------------------------------------------------------------
   def input_close(self):
@@ -117,34 +152,91 @@ class ASCIItable():
         self.__IO__['output'] += [str(what)]
     else:
       self.__IO__['output'] += [what]
+      self.__IO__['outputBytes'] += len(what) + 1
 
-    return self.__IO__['buffered'] or self.output_flush()
+    (rows,size) = self.__IO__['bufferLimits']
+    full = (rows > 0 and len(self.__IO__['output']) >= rows) or (size > 0 and self.__IO__['outputBytes'] >= size)
+
+    return self.__IO__['buffered'] and not full or self.output_flush()
 
 # ------------------------------------------------------------------
   def output_flush(self,
                    clear = True):
     try:
-      self.__IO__['output'] == [] or self.__IO__['out'].write('\n'.join(self.__IO__['output']) + '\n')
+      self.__IO__['output'] == [] or self._output_put('\n'.join(self.__IO__['output']) + '\n')
     except IOError:
       return False
     if clear: self.output_clear()
-    return True
+    return self.__IO__['writer'] is None or self.__IO__['writeError'] is None
 
 # ------------------------------------------------------------------
   def output_clear(self):
     self.__IO__['output'] = []
+    self.__IO__['outputBytes'] = 0
+
+# ------------------------------------------------------------------
+  def _output_put(self,
+                  text):
+    """write text to output file, or hand it over to background writer"""
+    if self.__IO__['writer'] is None:
+      self.__IO__['out'].write(text)
+    elif self.__IO__['writeError'] is not None:
+      raise IOError('background write failed: {}'.format(self.__IO__['writeError']))
+    else:
+      self.__IO__['writeQueue'].put(text)
+
+# ------------------------------------------------------------------
+  def _writer(self):
+    """background writer: write queued text until None is received, keeps draining after a failure"""
+    while True:
+      text = self.__IO__['writeQueue'].get()
+      if text is None: break
+      if self.__IO__['writeError'] is not None: continue
+      try:
+        self.__IO__['out'].write(text)
+      except Exception as e:
+        self.__IO__['writeError'] = e                                                               # report at next flush and at close
 
 # ------------------------------------------------------------------
   def output_close(self,
                    dismiss = False):
+    """
+    close output and, if in place, replace input with it
+
+    in-place output of a binary table is written as binary table of the same data type.
+    """
+    error = None
+    if self.__IO__['writer'] is not None:                                                           # wait for pending background writes
+      self.__IO__['writeQueue'].put(None)
+      self.__IO__['writer'].join()
+      self.__IO__['writer'] = None
+      error = self.__IO__['writeError']
     try:
       if self.__IO__['out'] != sys.stdout: self.__IO__['out'].close()
     except:
       pass
     if dismiss and os.path.isfile(self.__IO__['out'].name):
       os.remove(self.__IO__['out'].name)
-    elif self.__IO__['inPlace']:
-      os.rename(self.__IO__['out'].name, self.__IO__['out'].name[:-len(self.tmpext)])
+    elif self.__IO__['inPlace'] and error is None:                                                  # keep incomplete output from replacing input
+      if self.__IO__['binary'] is not None:                                                         # binary input stays binary under its name
+        self._binarize(self.__IO__['out'].name,self.__IO__['out'].name[:-len(self.tmpext)],
+                       self.__IO__['binary'].dtype)
+      else:
+        os.rename(self.__IO__['out'].name, self.__IO__['out'].name[:-len(self.tmpext)])
+    if error is not None: raise IOError('background write failed: {}'.format(error))
+
+# ------------------------------------------------------------------
+  def _binarize(self,
+                textname,
+                name,
+                dtype):
+    """convert text table textname into binary table name, replacing it only once complete"""
+    table = ASCIItable(textname,readonly = True,labeled = self.__IO__['labeled'])
+    table.head_read()
+    table.data_writeBinary(textname + self.tmpext,dtype)                                            # input may still be mapped, so do not overwrite it
+    table.close()
+    os.rename(textname + self.tmpext,name)
+    os.remove(textname)
 
 # ------------------------------------------------------------------
   def head_read(self):
@@ -154,7 +246,7 @@ class ASCIItable():
     by either reading the first row or,
     if keyword "head[*]" is present, the last line of the header
     """
-    import re,shlex
+    import re
 
     try:
       self.__IO__['in'].seek(0)
@@ -162,6 +254,11 @@ class ASCIItable():
       pass
 
     firstline = self.__IO__['in'].readline().strip()
+    binary = firstline.startswith(self.binaryMagic)
+    if binary:                                                                                      # binary table has regular header after its first line
+      (dtype,rows,columns,offset) = firstline.split()[-4:]
+      firstline = self.__IO__['in'].readline().strip()
+
     m = re.search('(\d+)\s+head', firstline.lower())                                                # search for "head" keyword
     
     if m:                                                                                           # proper ASCIItable format
@@ -199,6 +296,11 @@ class ASCIItable():
     except IOError:
       pass
 
+    if binary:
+      self.__IO__['binary'] = np.memmap(self.__IO__['in'].name,dtype = dtype,mode = 'r',
+                                        offset = int(offset),shape = (int(columns),int(rows)))
+      self.__IO__['row'] = 0
+
 # ------------------------------------------------------------------
   def head_write(self,
                  header = True):
@@ -453,6 +555,7 @@ class ASCIItable():
 # ------------------------------------------------------------------
   def data_rewind(self):
     self.__IO__['in'].seek(self.__IO__['dataStart'])                                                # position file to start of data section
+    self.__IO__['row'] = 0                                                                          # same for binary data
     self.__IO__['readBuffer'] = []                                                                  # delete any non-advancing data reads
     self.tags = list(self.__IO__['tags'])                                                           # restore label info found in header (as COPY, not link)
     self.__IO__['labeled'] = len(self.tags) > 0
@@ -470,9 +573,20 @@ class ASCIItable():
   def data_read(self,
                 advance = True,
                 respectLabels = True):
-    """read next line (possibly buffered) and parse it into data array"""
-    import shlex
-    
+    """
+    read next line (possibly buffered) and parse it into data array
+
+    data items are floats for numeric and binary tables (falling back to strings for non-numeric lines).
+    """
+    if self.__IO__['binary'] is not None:
+      if self.__IO__['row'] >= self.__IO__['binary'].shape[1]:
+        self.data = []
+      else:
+        self.data = self.__IO__['binary'][:,self.__IO__['row']].tolist()
+        self.__IO__['row'] += advance
+      self.line = '\t'.join(map(repr,self.data))
+      return self.data != []
+
     self.line = self.__IO__['readBuffer'].pop(0) if len(self.__IO__['readBuffer']) > 0 \
            else self.__IO__['in'].readline().strip()                                                # take buffered content or get next data row from file
 
@@ -482,10 +596,16 @@ class ASCIItable():
     self.line = self.line.rstrip('\n')
 
     if self.__IO__['labeled'] and respectLabels:                                                    # if table has labels
-      items = shlex.split(self.line)[:len(self.__IO__['tags'])]                                     # use up to label count (from original file info)
+      items = self._tokenize(self.line)[:len(self.__IO__['tags'])]                                  # use up to label count (from original file info)
       self.data = items if len(items) == len(self.__IO__['tags']) else []                           # take entries if label count matches
     else:
-      self.data = shlex.split(self.line)                                                            # otherwise take all
+      self.data = self._tokenize(self.line)                                                         # otherwise take all
+
+    if self.__IO__['numeric'] and respectLabels:
+      try:
+        self.data = list(map(float,self.data))
+      except ValueError:
+        pass
 
     return self.data != []
 
@@ -493,13 +613,130 @@ class ASCIItable():
   def data_readArray(self,
                      labels = []):
     """read whole data of all (given) labels as numpy array"""
-    from collections import Iterable
+    try:
+      self.data_rewind()                                                                            # try to wind back to start of data
+    except:
+      pass                                                                                          # assume/hope we are at data start already...
+
+    use,labels_missing = self._columns(labels)
 
+    if self.__IO__['binary'] is not None:
+      self.data = self._binaryColumns(use).T                                                        # (rows x columns) view if possible
+    else:
+      self.data = np.loadtxt(self.__IO__['in'],usecols=use,ndmin=2)
+
+    return labels_missing
+
+# ------------------------------------------------------------------
+  def data_readChunks(self,
+                      labels = [],
+                      rows = 65536):
+    """
+    iterate over data of all (given) labels as numpy arrays of (at most) given number of rows
+
+    labels are expanded as in data_readArray and missing ones are ignored.
+    reading starts at the beginning of the data and only holds one chunk in memory.
+    """
     try:
       self.data_rewind()                                                                            # try to wind back to start of data
     except:
       pass                                                                                          # assume/hope we are at data start already...
 
+    use,labels_missing = self._columns(labels)
+    columns = len(self.__IO__['tags']) if self.__IO__['labeled'] else 0
+
+    if self.__IO__['binary'] is not None:
+      data = self._binaryColumns(use)
+      for start in range(self.__IO__['row'],data.shape[1],rows):
+        self.data = data[:,start:start+rows].T
+        yield self.data
+      return
+
+    while True:
+      lines = []
+      for i in range(rows):
+        line = self.__IO__['in'].readline()
+        if line == '': break
+        lines.append(line)
+      if lines == []: return
+
+      try:
+        chunk = np.fromstring(''.join(lines),sep=' ') if columns > 0 else None                      # fast parsing of plain numeric lines ...
+      except ValueError:                                                                            # (numpy >= 2 rejects unparsable text)
+        chunk = None
+      if chunk is not None and len(chunk) == len(lines)*columns \
+         and all([len(line.split()) == columns for line in lines]):                                  # same number of columns in every line
+        chunk = chunk.reshape(len(lines),columns)
+        self.data = chunk[:,use] if use is not None else chunk
+      else:
+        self.data = np.loadtxt(lines,usecols=use,ndmin=2)                                           # ... otherwise use general parser
+
+      yield self.data
+
+# ------------------------------------------------------------------
+  def _binaryColumns(self,
+                     use):
+    """(columns x rows) binary data of given columns, without copy for consecutive columns"""
+    data = self.__IO__['binary']
+    if use is None:
+      return data
+    elif len(use) > 0 and np.array_equal(use,np.arange(use[0],use[0]+len(use))):
+      return data[use[0]:use[0]+len(use)]
+    else:
+      return data[use]
+
+# ------------------------------------------------------------------
+  def data_writeBinary(self,
+                       outname,
+                       dtype = 'float64',
+                       rows = 65536):
+    """
+    write header and all data of (text or binary) table as binary table
+
+    each column is stored contiguously as raw dtype after a copy of the ASCIItable header,
+    such that reading back maps the data into memory instead of parsing it.
+    """
+    try:
+      self.data_rewind()
+    except:
+      pass
+
+    if self.__IO__['binary'] is not None:
+      count = self.__IO__['binary'].shape[1]
+    else:
+      count = 0
+      for line in iter(self.__IO__['in'].readline,''):                                             # data lines as counted by np.loadtxt
+        line = line.strip()
+        count += line != '' and not line.startswith('#')
+      self.data_rewind()
+
+    head = ['{}\theader'.format(len(self.info)+self.__IO__['labeled'])] + self.info
+    if self.__IO__['labeled']: head.append('\t'.join(map(self._quote,self.tags)))
+    head = '\n'.join(head) + '\n'
+    magic = '{} {} {} {} {:020d}\n'
+    offset = len(magic.format(self.binaryMagic,np.dtype(dtype).name,count,len(self.tags),0)) + len(head)
+    offset = -(-offset//self.binaryAlign)*self.binaryAlign                                          # round up to alignment
+
+    with open(outname,'wb') as f:
+      f.write(magic.format(self.binaryMagic,np.dtype(dtype).name,count,len(self.tags),offset))
+      f.write(head)
+      f.truncate(offset + count*len(self.tags)*np.dtype(dtype).itemsize)                           # reserve space for data
+
+    if count*len(self.tags) > 0:
+      data = np.memmap(outname,dtype = dtype,mode = 'r+',offset = offset,shape = (len(self.tags),count))
+      start = 0
+      for chunk in self.data_readChunks(rows = rows):
+        data[:,start:start+len(chunk)] = chunk.T
+        start += len(chunk)
+      data.flush()
+      del data
+
+# ------------------------------------------------------------------
+  def _columns(self,
+               labels):
+    """column indices of (given) labels, all components of multi-dimensional labels, and list of missing labels"""
+    from collections import Iterable
+
     if labels is None or labels == []:
       use = None                                                                                    # use all columns (and keep labels intact)
       labels_missing = []
@@ -522,9 +759,7 @@ class ASCIItable():
 
       self.tags = list(np.array(self.tags)[use])                                                    # update labels with valid subset
 
-    self.data = np.loadtxt(self.__IO__['in'],usecols=use,ndmin=2)
-
-    return labels_missing
+    return use,labels_missing
 
 # ------------------------------------------------------------------
   def data_write(self,
@@ -532,7 +767,16 @@ class ASCIItable():
     """write current data array and report alive output back"""
     if len(self.data) == 0: return True
 
-    if isinstance(self.data[0],list):
+    if isinstance(self.data,np.ndarray) and self.data.dtype.kind in 'fiub':                        # numbers need no quoting
+      block = self._format(self.data.reshape(-1,self.data.shape[-1]),delimiter = delimiter)         # single row or block of rows
+      if self.__IO__['buffered']: return self.output_write(block.splitlines())
+      if not self.output_flush(): return False                                                      # keep order with pending output
+      try:
+        self._output_put(block)                                                                     # whole block in one write
+      except IOError:
+        return False
+      return self.__IO__['writer'] is None or self.__IO__['writeError'] is None
+    elif isinstance(self.data[0],list):
       return self.output_write([delimiter.join(map(self._quote,items)) for items in self.data])
     else:
       return self.output_write( delimiter.join(map(self._quote,self.data)))
@@ -540,15 +784,46 @@ class ASCIItable():
 # ------------------------------------------------------------------
   def data_writeArray(self,
                       fmt = None,
-                      delimiter = '\t'):
-    """write whole numpy array data"""
+                      delimiter = '\t',
+                      rows = 65536):
+    """
+    write whole numpy array data
+
+    fmt is a single format or a list of formats (one per column), default is full precision.
+    numeric arrays are formatted and written in blocks of rows.
+    """
+    self.output_flush()                                                                             # keep order with pending output
+
+    data = np.asarray(self.data)
+    if len(data) == 0: return
+    if data.dtype.kind in 'fiub' and data.ndim in [1,2]:
+      data = data.reshape(len(data),-1)
+      for start in range(0,len(data),rows):
+        self._output_put(self._format(data[start:start+rows],fmt,delimiter))
+      return
+
     for row in self.data:
       try:
         output = [fmt % value for value in row] if fmt else list(map(repr,row))
       except:
         output = [fmt % row] if fmt else [repr(row)]
       
-      self.__IO__['out'].write(delimiter.join(output) + '\n')
+      self._output_put(delimiter.join(output) + '\n')
+
+# ------------------------------------------------------------------
+  def _format(self,
+              data,
+              fmt = None,
+              delimiter = '\t'):
+    """(rows x columns) numeric array as text block with fixed format per column"""
+    data = data.reshape(len(data),-1)
+    if fmt is None:
+      fmt = '%r' if data.dtype in [np.float64,np.int64,np.int32,np.bool_] else None                 # Python repr agrees with numpy repr for these
+    if fmt is None:
+      return ''.join([delimiter.join(map(repr,row)) + '\n' for row in data])
+
+    fmt = [fmt]*data.shape[1] if isinstance(fmt, (str, unicode)) else list(fmt)
+    return ((delimiter.join(fmt) + '\n')*len(data)) % tuple(data.ravel().tolist())               # format whole block at once
 
 # ------------------------------------------------------------------
   def data_append(self,
@@ -0,0 +1,442 @@
+# -*- coding: UTF-8 no BOM -*-
+
+# equidistant discretization of spherical triangles
+import os,hashlib,zlib,zipfile,multiprocessing
+import numpy as np
+from .orientation import _norm,_symmetryTable
+
+# -----------------------------
+def _angles(a,b):
+  """angles in degrees between rows of unit vectors a and b"""
+  return np.degrees(2.0*np.arctan2(_norm(a-b),_norm(a+b)))                                         # accurate also for small angles
+
+# -----------------------------
+def _split(points,triangles,midpoint):
+  """
+  split (M,3) triangles of point indices into four at their edge midpoints
+
+  every edge is keyed by its sorted pair of point indices,
+  so a midpoint shared by two triangles is computed only once
+  """
+  edges = np.sort(np.vstack((triangles[:,[0,1]],triangles[:,[0,2]],triangles[:,[1,2]])),axis=1)
+  keys,first,inverse = np.unique(edges[:,0]*len(points)+edges[:,1],return_index=True,return_inverse=True)
+  mids = midpoint(points[edges[first,0]],points[edges[first,1]])
+  m = len(points) + inverse.reshape(3,len(triangles))                                               # indices of midpoints 01, 02, and 12
+  v = triangles.T
+  return np.vstack((points,mids)), \
+         np.vstack((np.column_stack((v[0],m[0],m[1])),
+                    np.column_stack((v[1],m[0],m[2])),
+                    np.column_stack((v[2],m[2],m[1])),
+                    np.column_stack((m[0],m[1],m[2])),
+                  ))
+
+# -----------------------------
+def subdivide(vertices,degree):
+  """
+  unique points of a triangle subdivided degree times as (N,3) array
+
+  points are the unnormalized midpoints (a+b)/2 of the previous level
+  """
+  points    = np.array(vertices,dtype=float)
+  triangles = np.array([[0,1,2]])
+  for level in range(degree):
+    points,triangles = _split(points,triangles,lambda a,b: (a+b)/2)
+  return points
+
+# -----------------------------
+def normalize(points):
+  """unit directions of (N,3) points, zero vectors are left untouched"""
+  directions = np.array(points,dtype=float)
+  norms = _norm(directions)
+  directions[norms != 0.0] /= norms[norms != 0.0,np.newaxis]
+  return directions
+
+# -----------------------------
+def stereographic(directions):
+  """stereographic projection (X,Y) of (N,3) unit directions"""
+  return directions[:,:2]/(1 + np.abs(directions[:,2:3]))
+
+# -----------------------------
+def eulers(directions):
+  """Bunge Euler angles (phi1,PHI,phi2) in degrees of (N,3) unit directions"""
+  zeta = np.degrees(np.arctan2(directions[:,1],directions[:,0]))
+  eta  = np.degrees(np.arccos(directions[:,2]))
+  return np.column_stack((270 + zeta,eta,90 - zeta))
+
+# -----------------------------
+def _refineStep(points,triangles,gap):
+  """
+  split all edges of (M,3) triangles that are longer than gap (in degrees) at their great circle midpoints
+
+  returns extended points, the new triangles, and the number of triangles that needed no split
+  """
+  lengths = np.column_stack([_angles(points[triangles[:,i]],points[triangles[:,(i+1)%3]]) for i in range(3)])
+  active  = (lengths > gap).any(axis=1)
+  triangles,long = triangles[active],(lengths > gap)[active]
+  if len(triangles) == 0: return points,triangles,len(active)
+
+  edges = np.sort(np.column_stack((triangles,triangles[:,[1,2,0]])).reshape(-1,2,3).transpose(0,2,1)[long],axis=1)
+  unique,first,inverse = np.unique(edges[:,0]*len(points)+edges[:,1],return_index=True,return_inverse=True)
+  m = np.zeros_like(triangles)
+  m[long] = len(points) + inverse                                                                    # midpoint of edge (i,i+1) in column i
+  points = np.vstack((points,normalize(points[edges[first,0]]+points[edges[first,1]])))
+
+  n = long.sum(axis=1)
+  r = np.where(n == 1,np.argmax(long,axis=1),(np.argmin(long,axis=1)+1)%3)                         # rotate long edge to (0,1), or short edge to (2,0)
+  rotation = (r[:,np.newaxis]+[0,1,2])%3
+  v = triangles[np.arange(len(triangles))[:,np.newaxis],rotation].T
+  m = m[np.arange(len(triangles))[:,np.newaxis],rotation].T
+  one,two,three = n == 1,n == 2,n == 3
+  diagonal = _angles(points[v[0]],points[m[1]]) <= _angles(points[m[0]],points[v[2]])             # shorter diagonal of remaining quadrilateral
+  a,b = two & diagonal,two & ~diagonal
+  return points, \
+         np.vstack((np.column_stack((v[0],m[0],v[2]))[one],
+                    np.column_stack((m[0],v[1],v[2]))[one],
+                    np.column_stack((m[0],v[1],m[1]))[two],
+                    np.column_stack((v[0],m[0],m[1]))[a],
+                    np.column_stack((v[0],m[1],v[2]))[a],
+                    np.column_stack((v[0],m[0],v[2]))[b],
+                    np.column_stack((m[0],m[1],v[2]))[b],
+                    np.column_stack((v[0],m[0],m[2]))[three],
+                    np.column_stack((m[0],v[1],m[1]))[three],
+                    np.column_stack((m[2],m[1],v[2]))[three],
+                    np.column_stack((m[0],m[1],m[2]))[three],
+                  )), \
+         np.count_nonzero(~active)
+
+# -----------------------------
+def refine(vertices,gap,limit = None):
+  """
+  unique unit directions of a triangle refined until no sub-triangle edge is longer than gap (in degrees)
+
+  only edges longer than gap are split, at their great circle midpoints. a triangle with three such
+  edges is split into four, one with two into three, and one with one into two, so the mesh stays
+  conforming and short edges of elongated triangles are not refined needlessly.
+  returns None as soon as more than limit points would result.
+  """
+  if gap <= 0.0: raise ValueError('angular gap needs to be positive.')
+  points    = normalize(vertices)
+  triangles = np.array([[0,1,2]])
+  while len(triangles) > 0:
+    points,triangles,finished = _refineStep(points,triangles,gap)
+    if limit is not None and len(points) > limit: return None
+  return points
+
+# -----------------------------
+def refineSize(vertices,gap,limit = None):
+  """
+  numbers of points and of final triangles of refine() without generating the grid
+
+  only points of triangles that may still be split are kept.
+  returns None as soon as more than limit points would result.
+  """
+  if gap <= 0.0: raise ValueError('angular gap needs to be positive.')
+  points    = normalize(vertices)
+  triangles = np.array([[0,1,2]])
+  created,leaves = len(points),0
+  while len(triangles) > 0:
+    known = len(points)
+    points,triangles,finished = _refineStep(points,triangles,gap)
+    created += len(points) - known
+    leaves  += finished
+    if limit is not None and created > limit: return None
+    used,inverse = np.unique(triangles.ravel(),return_inverse=True)                                  # drop points of finished triangles
+    points,triangles = points[used],inverse.reshape(-1,3)
+  return created,leaves
+
+# -----------------------------
+def budgetGap(vertices,count,tolerance = 1e-3):
+  """smallest angular gap (in degrees, within relative tolerance) whose refinement has at most count points"""
+  vertices = normalize(vertices)
+  lo,hi = 0.0,max(_angles(vertices[[0,0,1]],vertices[[1,2,2]]))
+  while hi - lo > tolerance*hi:
+    if refineSize(vertices,(lo+hi)/2.,count) is None:
+      lo = (lo+hi)/2.
+    else:
+      hi = (lo+hi)/2.
+  return hi
+
+# -----------------------------
+def budget(vertices,count,tolerance = 1e-3):
+  """
+  finest refinement of a triangle with at most count points
+
+  bisects the angular gap (in degrees) and returns the unit directions and the gap used
+  """
+  gap = budgetGap(vertices,count,tolerance)
+  return refine(vertices,gap),gap
+
+# -----------------------------
+def triangle(p1 = [0., 0., 1.],
+             p2 = [1., 0., 1.],
+             p3 = [1., 1., 1.]):
+  """(3,3) unit vertices of the spherical triangle p1,p2,p3"""
+  return np.array([np.array(p,dtype=float)/np.linalg.norm(p) for p in (p1,p2,p3)])
+
+# -----------------------------
+def grid(p1 = [0., 0., 1.],
+         p2 = [1., 0., 1.],
+         p3 = [1., 1., 1.],
+         degree = 3,
+         gap = None,
+         count = None):
+  """
+  unit directions discretizing the spherical triangle p1,p2,p3
+
+  uses the finest refinement with at most count points if count is given, otherwise
+  refines until no spacing exceeds gap (in degrees) if given, otherwise subdivides degree times
+  """
+  vertices = triangle(p1,p2,p3)
+  if count is not None: gap = budgetGap(vertices,count)
+  if gap   is not None: return refine(vertices,gap)
+  return normalize(subdivide(vertices,degree))
+
+# -----------------------------
+def gridSize(p1 = [0., 0., 1.],
+             p2 = [1., 0., 1.],
+             p3 = [1., 1., 1.],
+             degree = 3,
+             gap = None,
+             count = None):
+  """number of directions grid() would return, without generating them"""
+  vertices = triangle(p1,p2,p3)
+  if count is not None: gap = budgetGap(vertices,count)
+  if gap   is not None: return refineSize(vertices,gap)[0]
+  return (2**degree+1)*(2**degree+2)//2
+
+# -----------------------------
+def discretize(p1 = [0., 0., 1.],
+               p2 = [1., 0., 1.],
+               p3 = [1., 1., 1.],
+               degree = 3,
+               gap = None,
+               count = None):
+  """
+  equidistant discretization of the spherical triangle p1,p2,p3, see grid()
+
+  returns (N,3) directions, (N,2) stereographic coordinates, and (N,3) Bunge Euler angles in degrees
+  """
+  directions = grid(p1,p2,p3,degree,gap,count)
+  return directions,stereographic(directions),eulers(directions)
+
+
+# -----------------------------
+def _unique(points,decimals = 9):
+  """
+  indices of first occurrences and inverse mapping of (N,3) points that agree to decimals
+
+  groups keep the order of their first occurrence
+  """
+  rounded = np.round(points,decimals)
+  order = np.lexsort(rounded.T[::-1])                                                               # stable, so first member of group has lowest index
+  new   = np.append([True],np.any(np.diff(rounded[order],axis=0) != 0.0,axis=1))
+  first = order[new]
+  rank  = np.empty(len(first),dtype=int)
+  rank[np.argsort(first)] = np.arange(len(first))
+  inverse = np.empty(len(points),dtype=int)
+  inverse[order] = rank[np.cumsum(new)-1]
+  return np.sort(first),inverse
+
+# -----------------------------
+def icosahedron():
+  """(20,3,3) unit vertices of the faces of an icosahedron"""
+  t = (1.0 + np.sqrt(5.0))/2.0
+  vertices = normalize(np.array([[-1, t, 0],[ 1, t, 0],[-1,-t, 0],[ 1,-t, 0],
+                                 [ 0,-1, t],[ 0, 1, t],[ 0,-1,-t],[ 0, 1,-t],
+                                 [ t, 0,-1],[ t, 0, 1],[-t, 0,-1],[-t, 0, 1]],dtype=float))
+  faces = [[0,11, 5],[0, 5, 1],[0, 1, 7],[0, 7,10],[0,10,11],
+           [1, 5, 9],[5,11, 4],[11,10,2],[10,7, 6],[7, 1, 8],
+           [3, 9, 4],[3, 4, 2],[3, 2, 6],[3, 6, 8],[3, 8, 9],
+           [4, 9, 5],[2, 4,11],[6, 2,10],[8, 6, 7],[9, 8, 1]]
+  return vertices[np.array(faces)]
+
+# -----------------------------
+standardTriangles = {
+                     'orthorhombic': [[0.,0.,1.],[1.,0.,0.],[0.,1.,0.]],
+                     'tetragonal':   [[0.,0.,1.],[1.,0.,0.],[1.,1.,0.]],
+                     'hexagonal':    [[0.,0.,1.],[1.,0.,0.],[np.sqrt(3.)/2.,0.5,0.]],
+                     'cubic':        [[0.,0.,1.],[1.,0.,1.],[1.,1.,1.]],
+                    }
+
+def laueTriangles(symmetry = 'cubic',
+                  vertices = None):
+  """
+  (T,3,3) images of a standard triangle under all operations of the Laue group of symmetry
+
+  these tile the whole sphere if vertices (default: standard triangle of symmetry) bound a fundamental sector
+  """
+  vertices  = normalize(np.array(standardTriangles[symmetry] if vertices is None else vertices,dtype=float))
+  proper    = np.einsum('sij,vj->svi',_symmetryTable(symmetry)['matrices'],vertices)
+  return np.vstack((proper,-proper))                                                                # inversion completes Laue group
+
+# -----------------------------
+def _snap(triangles):
+  """(T,3,3) unit vertices of triangles, with vertices shared by several triangles made identical"""
+  corners = normalize(np.array(triangles,dtype=float).reshape(-1,3))
+  first,inverse = _unique(corners)
+  return corners[first][inverse].reshape(-1,3,3)
+
+# -----------------------------
+def _discretizeTriangle(args):
+  """unit directions of a single triangle, args being (vertices,degree,gap)"""
+  vertices,degree,gap = args
+  return refine(vertices,gap) if gap is not None else normalize(subdivide(vertices,degree))
+
+def sphere(triangles,
+           degree = 3,
+           gap = None,
+           jobs = 1):
+  """
+  unique unit directions discretizing a set of (T,3,3) spherical triangles
+
+  triangles are discretized in a pool of jobs processes. vertices shared by several triangles
+  are snapped to identical coordinates beforehand (see _snap), so points along shared edges
+  coincide exactly and are merged globally.
+  """
+  work = [(vertices,degree,gap) for vertices in _snap(triangles)]
+  if jobs > 1 and len(work) > 1:
+    pool = multiprocessing.Pool(min(jobs,len(work)))
+    parts = pool.map(_discretizeTriangle,work)
+    pool.close()
+    pool.join()
+  else:
+    parts = [_discretizeTriangle(args) for args in work]
+  points = np.vstack(parts)
+  return points[_unique(points)[0]]
+
+# -----------------------------
+def sphereSize(triangles,
+               degree = 3,
+               gap = None):
+  """
+  number of directions sphere() would return for triangles tiling the whole sphere, without generating them
+
+  follows from Euler's formula V = 2 + F/2 for the closed triangulation of F final triangles
+  """
+  triangles = _snap(triangles)
+  if gap is None: return 2 + len(triangles)*4**degree//2
+  return 2 + sum([refineSize(vertices,gap)[1] for vertices in triangles])//2
+
+# ******************************************************************************************
+class GridCache:
+  """
+  on-disk cache of discretized spherical triangles
+
+  grids are stored as one .npz file each, named by the hash of their normalized vertices,
+  refinement parameters, and symmetry. every file carries its key and a checksum of its arrays,
+  and corrupt or mismatching files are discarded. least recently used files are evicted
+  once the cache grows beyond size bytes.
+  """
+
+  version = 1
+
+  def __init__(self,
+               path = None,
+               size = 2**28):
+    self.path = path if path is not None else \
+                os.path.join(os.environ.get('XDG_CACHE_HOME',os.path.join(os.path.expanduser('~'),'.cache')),
+                             'SphericalOrientations')
+    self.size = size
+
+# ------------------------------------------------------------------
+  def key(self,
+          vertices,
+          degree = 3,
+          gap = None,
+          count = None,
+          symmetry = None):
+    """canonical description of a grid of one (3,3) or several (T,3,3) triangles"""
+    vertices = normalize(np.array(vertices,dtype=float).reshape(-1,3))
+    refinement = 'count {}'.format(count) if count is not None else \
+                 'gap {!r}'.format(float(gap)) if gap is not None else \
+                 'degree {}'.format(degree)
+    return 'version {} vertices {} {} symmetry {}'.format(self.version,
+                                                          ' '.join(['{:.12g}'.format(x) for x in vertices.ravel()]),
+                                                          refinement,symmetry)
+
+# ------------------------------------------------------------------
+  def _file(self,key):
+    return os.path.join(self.path,hashlib.sha1(key.encode('utf-8')).hexdigest()+'.npz')
+
+# ------------------------------------------------------------------
+  def _checksum(self,arrays):
+    checksum = 0
+    for array in arrays: checksum = zlib.crc32(np.ascontiguousarray(array).data,checksum)
+    return checksum & 0xffffffff
+
+# ------------------------------------------------------------------
+  def load(self,key):
+    """arrays stored under key, or None if missing or corrupt"""
+    name = self._file(key)
+    if not os.path.exists(name): return None
+    try:
+      valid = zipfile.is_zipfile(name)                                                              # catches truncated files
+      if valid:
+        with np.load(name) as data:
+          arrays = data['directions'],data['projection'],data['eulers']
+          valid  = str(data['key']) == key and int(data['checksum']) == self._checksum(arrays)
+    except Exception:
+      valid = False
+    if not valid:
+      try:    os.remove(name)
+      except OSError: pass
+      return None
+    try:    os.utime(name,None)                                                                     # mark as recently used
+    except OSError: pass
+    return arrays
+
+# ------------------------------------------------------------------
+  def store(self,key,arrays):
+    """
+    store arrays under key and evict old entries, failures only cost the cache entry
+
+    entries larger than the whole cache are not stored, as they would evict everything else.
+    """
+    if sum([np.asarray(array).nbytes for array in arrays]) > self.size: return
+    name = self._file(key)
+    temp = '{}.{}.tmp'.format(name,os.getpid())
+    try:
+      if not os.path.isdir(self.path): os.makedirs(self.path)
+      with open(temp,'wb') as f:
+        np.savez(f,key = key,checksum = self._checksum(arrays),
+                 directions = arrays[0],projection = arrays[1],eulers = arrays[2])
+      if os.path.getsize(temp) > self.size: raise OSError('entry exceeds cache size')              # archive overhead may still exceed it
+      os.rename(temp,name)                                                                          # atomic, so readers never see partial files
+    except (IOError,OSError):
+      try:    os.remove(temp)
+      except OSError: pass
+      return
+    self.evict()
+
+# ------------------------------------------------------------------
+  def evict(self):
+    """remove least recently used entries until the cache fits into its size"""
+    try:
+      files = [os.path.join(self.path,f) for f in os.listdir(self.path) if f.endswith('.npz')]
+      files = sorted([(os.path.getmtime(f),os.path.getsize(f),f) for f in files])
+    except OSError:
+      return
+    total = sum([size for (time,size,f) in files])
+    for (time,size,f) in files:
+      if total <= self.size: break
+      try:
+        os.remove(f)
+        total -= size
+      except OSError: pass
+
+# ------------------------------------------------------------------
+  def discretize(self,
+                 p1 = [0., 0., 1.],
+                 p2 = [1., 0., 1.],
+                 p3 = [1., 1., 1.],
+                 degree = 3,
+                 gap = None,
+                 count = None,
+                 symmetry = None):
+    """cached discretize(), symmetry only distinguishes entries"""
+    key = self.key([p1,p2,p3],degree,gap,count,symmetry)
+    arrays = self.load(key)
+    if arrays is None:
+      arrays = discretize(p1,p2,p3,degree,gap,count)
+      self.store(key,arrays)
+    return arrays
@@ -90,6 +90,8 @@ class Quaternion:
 
     def __mul__(self, other):
       """multiplication"""
+      if isinstance(other, QuaternionArray):                        # batch of quaternions
+          return QuaternionArray([self.w,self.x,self.y,self.z],homomorph = False)*other
       try:                                                          # quaternion
           Aw = self.w
           Ax = self.x
@@ -551,6 +553,481 @@ class Quaternion:
         return Q
 
 
+# ******************************************************************************************
+def _multiply(A,B):
+    """
+    Quaternion product of (...,4) arrays
+
+    broadcasts like numpy and keeps the operation order of Quaternion.__mul__ to reproduce its results
+    """
+    Aw,Ax,Ay,Az = A[...,0],A[...,1],A[...,2],A[...,3]
+    Bw,Bx,By,Bz = B[...,0],B[...,1],B[...,2],B[...,3]
+    return np.stack([- Ax * Bx - Ay * By - Az * Bz + Aw * Bw,
+                     + Ax * Bw + Ay * Bz - Az * By + Aw * Bx,
+                     - Ax * Bz + Ay * Bw + Az * Bx + Aw * By,
+                     + Ax * By - Ay * Bx + Az * Bw + Aw * Bz,
+                    ],axis=-1)
+
+def _norm(V):
+    """Euclidean norms of (...,3) vectors, evaluated like np.linalg.norm of an individual vector"""
+    P = np.zeros(np.shape(V)[:-1]+(4,))                                                             # aligned rows give same BLAS dot as a freshly allocated 3-vector
+    P[...,:3] = V
+    P = P[...,:3]
+    return np.sqrt(np.matmul(P[...,np.newaxis,:],P[...,:,np.newaxis])[...,0,0])
+
+def _rodrigues(Q):
+    """Rodrigues vectors of (...,4) quaternions, infinite for w == 0 as in Quaternion.asRodrigues"""
+    zero = Q[...,0] == 0.0
+    R = Q[...,1:]/np.where(zero,1.0,Q[...,0])[...,np.newaxis]
+    R[zero] = np.inf
+    return R
+
+def _rotate(Q,V):
+    """
+    Active rotation of (...,3) vectors by (...,4) quaternions
+
+    broadcasts like numpy and keeps the operation order of Quaternion.__mul__ to reproduce its results
+    """
+    w,x,y,z    = Q[...,0],Q[...,1],Q[...,2],Q[...,3]
+    Vx,Vy,Vz   = V[...,0],V[...,1],V[...,2]
+    return np.stack([\
+             w * w * Vx + 2 * y * w * Vz - 2 * z * w * Vy + \
+             x * x * Vx + 2 * y * x * Vy + 2 * z * x * Vz - \
+             z * z * Vx - y * y * Vx,
+             2 * x * y * Vx + y * y * Vy + 2 * z * y * Vz + \
+             2 * w * z * Vx - z * z * Vy + w * w * Vy - \
+             2 * x * w * Vz - x * x * Vy,
+             2 * x * z * Vx + 2 * y * z * Vy + \
+             z * z * Vz - 2 * w * y * Vx - y * y * Vz + \
+             2 * w * x * Vy - x * x * Vz + w * w * Vz ],axis=-1)
+
+
+# ******************************************************************************************
+class QuaternionArray:
+    """
+    N orientations represented as unit quaternions in a contiguous (N,4) array
+
+    Batched counterpart of Quaternion with identical conventions (w,x,y,z) and ACTIVE rotation.
+    Multiplication broadcasts against a single Quaternion or a QuaternionArray of length one,
+    so results match those of the scalar class applied row by row.
+    b = Q * a        with a of shape (3,) or (N,3)
+    """
+
+    __slots__ = ['q']
+
+    def __init__(self,
+                 quatArray = [[1.0,0.0,0.0,0.0]],
+                 homomorph = True):
+      """initializes to single identity if not given, homomorph = False wraps (N,4) float array as is"""
+      q = np.require(quatArray,dtype='d',requirements='C').reshape(-1,4)
+      self.q = np.where(q[:,:1] < 0.0,-q,q) if homomorph else q
+
+    def __len__(self):
+      """number of quaternions"""
+      return len(self.q)
+
+    def __iter__(self):
+      """individual quaternions"""
+      return iter([self[i] for i in range(len(self))])
+
+    def __getitem__(self, item):
+      """Quaternion for integer index, QuaternionArray (copy) for slices, masks, and index arrays"""
+      if isinstance(item, (int,np.integer)):
+        Q = Quaternion()
+        Q.w,Q.x,Q.y,Q.z = self.q[item]                                                              # keep sign as is (no homomorph)
+        return Q
+      return self.__class__(np.array(self.q[item]),homomorph = False)
+
+    def __copy__(self):
+      """create copy"""
+      return self.__class__(self.q.copy(),homomorph = False)
+
+    copy = __copy__
+
+    def __repr__(self):
+      """readbable string"""
+      return 'QuaternionArray(N=%i)\n%s' % (len(self),self.q)
+
+    def __mul__(self, other):
+      """multiplication by Quaternion(s), (N,3) or (3,) vector(s), or scalar(s)"""
+      if isinstance(other, Quaternion):
+        other = self.__class__([other.w,other.x,other.y,other.z],homomorph = False)
+      if isinstance(other, QuaternionArray):                                                        # quaternion
+        return self.__class__(_multiply(self.q,other.q),homomorph = False)
+
+      other = np.asarray(other,dtype='d')
+      if other.ndim > 0 and other.shape[-1] == 3:                                                   # vector (perform active rotation, i.e. q*v*q.conjugated)
+        return _rotate(self.q,other)
+      return self.__class__(self.q*other.reshape(-1,1),homomorph = False)                           # scalar
+
+    def __abs__(self):
+      """norms"""
+      return np.sqrt(np.power(self.q[:,0],2) + \
+                     np.power(self.q[:,1],2) + \
+                     np.power(self.q[:,2],2) + \
+                     np.power(self.q[:,3],2))
+
+    magnitude = __abs__
+
+    def normalize(self):
+      d = self.magnitude()
+      d[d <= 0.0] = 1.0
+      self.q /= d[:,np.newaxis]
+      return self
+
+    def conjugate(self):
+      self.q[:,1:] *= -1.0
+      return self
+
+    def inverse(self):
+      d = self.magnitude()
+      d[d <= 0.0] = 1.0
+      self.conjugate()
+      self.q /= d[:,np.newaxis]
+      return self
+
+    def homomorph(self):
+      self.q[self.q[:,0] < 0.0] *= -1.0
+      return self
+
+    def normalized(self):
+      return self.copy().normalize()
+
+    def conjugated(self):
+      return self.copy().conjugate()
+
+    def inversed(self):
+      return self.copy().inverse()
+
+    def homomorphed(self):
+      return self.copy().homomorph()
+
+    def asArray(self):
+      return self.q
+
+    def asM(self):                                                                                  # to find Averaging Quaternions (see F. Landis Markley et al.)
+      return np.einsum('ni,nj->nij',self.q,self.q)
+
+    def asMatrix(self):
+      w,x,y,z = self.q.T
+      return np.stack([
+        np.stack([1.0-2.0*(y*y+z*z),     2.0*(x*y-z*w),     2.0*(x*z+y*w)],axis=-1),
+        np.stack([    2.0*(x*y+z*w), 1.0-2.0*(x*x+z*z),     2.0*(y*z-x*w)],axis=-1),
+        np.stack([    2.0*(x*z-y*w),     2.0*(x*w+y*z), 1.0-2.0*(x*x+y*y)],axis=-1),
+                      ],axis=1)
+
+    def asAngleAxis(self,
+                    degrees = False):
+      """(N,) angles and (N,3) axes, rows with w > 1 are evaluated normalized (without altering self)"""
+      q = self.q
+      if np.any(q[:,0] > 1):
+        q = np.where(q[:,:1] > 1,self.normalized().q,q)
+
+      s = np.sqrt(np.maximum(0.0,1. - np.power(q[:,0],2)))
+      x = 2*np.power(q[:,0],2) - 1.
+      y = 2*q[:,0] * s
+
+      angle = np.arctan2(y,x)
+      negative = angle < 0.0
+      angle[negative] *= -1.
+      s    [negative] *= -1.
+
+      small = np.abs(angle) < 1e-6
+      s[small] = 1.0
+      axis = q[:,1:]/s[:,np.newaxis]
+      axis[small] = [1.0, 0.0, 0.0]
+
+      return (np.degrees(angle) if degrees else angle,
+              axis)
+
+    def asRodrigues(self):
+      return _rodrigues(self.q)
+
+    def asEulers(self,
+                 type = "bunge",
+                 degrees = False,
+                 standardRange = False):
+      """
+      (N,3) Bunge-Euler angles
+
+      same conversion as Quaternion.asEulers with both degenerate cases selected by masks
+      (squares evaluated as np.power to reproduce the scalar results)
+      """
+      angles = np.zeros((len(self),3))
+
+      if type.lower() == 'bunge' or type.lower() == 'zxz':
+        w,x,y,z = self.q.T
+        polar = (np.abs(x) < 1e-4) & (np.abs(y) < 1e-4)                                             # rotation about z
+        flip  = (np.abs(w) < 1e-4) & (np.abs(z) < 1e-4) & ~polar                                    # half turn about axis in xy-plane
+        other = ~(polar | flip)
+
+        angles[polar,0] = np.arctan2(2.*w[polar]*z[polar],np.power(w[polar],2) - np.power(z[polar],2))
+        angles[flip, 0] = np.arctan2(2.*x[flip]*y[flip],  np.power(x[flip],2) - np.power(y[flip],2))
+        angles[flip, 1] = math.pi
+
+        w,x,y,z = w[other],x[other],y[other],z[other]
+        chi = np.sqrt((np.power(w,2) + np.power(z,2))*(np.power(x,2) + np.power(y,2)))
+        angles[other,0] = np.arctan2((w * y + x * z)/2./chi,(w * x - y * z)/2./chi)
+        angles[other,1] = np.arctan2(2.*chi,np.power(w,2) + np.power(z,2) - (np.power(x,2) + np.power(y,2)))
+        angles[other,2] = np.arctan2((z * x - y * w)/2./chi,(w * x + y * z)/2./chi)
+
+        if standardRange:
+          angles[:,0] %= 2*math.pi
+          negative = angles[:,1] < 0.0
+          angles[negative,1] += math.pi
+          angles[negative,2] *= -1.0
+          angles[:,2] %= 2*math.pi
+
+      return np.degrees(angles) if degrees else angles
+
+#    # Static constructors
+    @classmethod
+    def fromIdentity(cls,N = 1):
+      return cls(np.tile([1.0,0.0,0.0,0.0],(N,1)),homomorph = False)
+
+    @classmethod
+    def fromQuaternions(cls,quaternions):
+      """stack list of Quaternion objects"""
+      return cls([[q.w,q.x,q.y,q.z] for q in quaternions],homomorph = False)
+
+
+    @classmethod
+    def fromRodrigues(cls, rodrigues):
+      """from (N,3) Rodrigues vectors"""
+      rodrigues = np.array(rodrigues,dtype='d').reshape(-1,3)
+      c = np.cos(np.arctan(_norm(rodrigues)))[:,np.newaxis]
+      return cls(np.hstack((c,c*rodrigues)))
+
+
+    @classmethod
+    def fromAngleAxis(cls,
+                      angle,
+                      axis = None,
+                      degrees = False):
+      """from (N,) angles and (N,3) axes or from (N,4) array of angle followed by axis"""
+      if axis is None:
+        angleAxis = np.array(angle,dtype='d').reshape(-1,4)
+        angle,axis = angleAxis[:,0],angleAxis[:,1:4]
+      angle = np.array(angle,dtype='d').reshape(-1)
+      axis  = np.array(axis, dtype='d').reshape(-1,3)
+      axis  = axis/_norm(axis)[:,np.newaxis]
+      angle = np.radians(angle) if degrees else angle
+      s = np.sin(0.5 * angle)[:,np.newaxis]
+      w = np.cos(0.5 * angle)[:,np.newaxis]
+      return cls(np.hstack((w,axis * s)))
+
+
+    @classmethod
+    def fromEulers(cls,
+                   eulers,
+                   type = 'Bunge',
+                   degrees = False):
+      """from (N,3) Euler angles"""
+      eulers = np.array(eulers,dtype='d').reshape(-1,3)
+      eulers = np.radians(eulers) if degrees else eulers
+
+      c = np.cos(0.5 * eulers)
+      s = np.sin(0.5 * eulers)
+
+      if type.lower() == 'bunge' or type.lower() == 'zxz':
+        w =   c[:,0] * c[:,1] * c[:,2] - s[:,0] * c[:,1] * s[:,2]
+        x =   c[:,0] * s[:,1] * c[:,2] + s[:,0] * s[:,1] * s[:,2]
+        y = - c[:,0] * s[:,1] * s[:,2] + s[:,0] * s[:,1] * c[:,2]
+        z =   c[:,0] * c[:,1] * s[:,2] + s[:,0] * c[:,1] * c[:,2]
+      else:
+        w = c[:,0] * c[:,1] * c[:,2] - s[:,0] * s[:,1] * s[:,2]
+        x = s[:,0] * s[:,1] * c[:,2] + c[:,0] * c[:,1] * s[:,2]
+        y = s[:,0] * c[:,1] * c[:,2] + c[:,0] * s[:,1] * s[:,2]
+        z = c[:,0] * s[:,1] * c[:,2] - s[:,0] * c[:,1] * s[:,2]
+      return cls(np.stack([w,x,y,z],axis=-1))
+
+
+    @classmethod
+    def fromMatrix(cls, m):
+      """from (N,3,3) or (N,9) rotation matrices, selecting the numerically stable branch per row"""
+      m = np.array(m,dtype='d').reshape(-1,3,3)
+      q = np.empty((len(m),4))
+
+      tr = m[:,0,0] + m[:,1,1] + m[:,2,2]
+      branch = np.where(tr > 1e-8,0,
+               np.where((m[:,0,0] > m[:,1,1]) & (m[:,0,0] > m[:,2,2]),1,
+               np.where(m[:,1,1] > m[:,2,2],2,3)))
+
+      b = m[branch == 0]
+      s = np.sqrt(tr[branch == 0] + 1.0)*2.0
+      q[branch == 0] = np.stack([ s*0.25,
+                                  (b[:,2,1] - b[:,1,2])/s,
+                                  (b[:,0,2] - b[:,2,0])/s,
+                                  (b[:,1,0] - b[:,0,1])/s,
+                                ],axis=-1)
+
+      b = m[branch == 1]
+      s = 2.0*np.sqrt(b[:,0,0] - b[:,1,1] - b[:,2,2] + 1.0)
+      q[branch == 1] = np.stack([ (b[:,2,1] - b[:,1,2])/s,
+                                  s*0.25,
+                                  (b[:,0,1] + b[:,1,0])/s,
+                                  (b[:,2,0] + b[:,0,2])/s,
+                                ],axis=-1)
+
+      b = m[branch == 2]
+      s = 2.0*np.sqrt(-b[:,0,0] + b[:,1,1] - b[:,2,2] + 1.0)
+      q[branch == 2] = np.stack([ (b[:,0,2] - b[:,2,0])/s,
+                                  (b[:,0,1] + b[:,1,0])/s,
+                                  s*0.25,
+                                  (b[:,1,2] + b[:,2,1])/s,
+                                ],axis=-1)
+
+      b = m[branch == 3]
+      s = 2.0*np.sqrt(-b[:,0,0] - b[:,1,1] + b[:,2,2] + 1.0)
+      q[branch == 3] = np.stack([ (b[:,1,0] - b[:,0,1])/s,
+                                  (b[:,2,0] + b[:,0,2])/s,
+                                  (b[:,1,2] + b[:,2,1])/s,
+                                  s*0.25,
+                                ],axis=-1)
+
+      return cls(q)
+
+
+# ******************************************************************************************
+_symmetryTables = {}                                                                                # constants per lattice, built once on first use
+
+def _symmetryTable(lattice):
+  """
+  Read-only constants of given lattice symmetry.
+
+  quaternions:  (S,4) symmetry operators (homomorphed)
+  matrices:     (S,3,3) symmetry operators
+  SST:          {'improper','proper'} (3,3) bases of the standard stereographic triangle
+  FZ:           constants bounding the fundamental zone in Rodrigues space (see Symmetry.inFZ)
+  """
+  if lattice in _symmetryTables: return _symmetryTables[lattice]
+
+  if lattice == 'cubic':
+    symQuats =  [
+                  [ 1.0,              0.0,              0.0,              0.0              ],
+                  [ 0.0,              1.0,              0.0,              0.0              ],
+                  [ 0.0,              0.0,              1.0,              0.0              ],
+                  [ 0.0,              0.0,              0.0,              1.0              ],
+                  [ 0.0,              0.0,              0.5*math.sqrt(2), 0.5*math.sqrt(2) ],
+                  [ 0.0,              0.0,              0.5*math.sqrt(2),-0.5*math.sqrt(2) ],
+                  [ 0.0,              0.5*math.sqrt(2), 0.0,              0.5*math.sqrt(2) ],
+                  [ 0.0,              0.5*math.sqrt(2), 0.0,             -0.5*math.sqrt(2) ],
+                  [ 0.0,              0.5*math.sqrt(2),-0.5*math.sqrt(2), 0.0              ],
+                  [ 0.0,             -0.5*math.sqrt(2),-0.5*math.sqrt(2), 0.0              ],
+                  [ 0.5,              0.5,              0.5,              0.5              ],
+                  [-0.5,              0.5,              0.5,              0.5              ],
+                  [-0.5,              0.5,              0.5,             -0.5              ],
+                  [-0.5,              0.5,             -0.5,              0.5              ],
+                  [-0.5,             -0.5,              0.5,              0.5              ],
+                  [-0.5,             -0.5,              0.5,             -0.5              ],
+                  [-0.5,             -0.5,             -0.5,              0.5              ],
+                  [-0.5,              0.5,             -0.5,             -0.5              ],
+                  [-0.5*math.sqrt(2), 0.0,              0.0,              0.5*math.sqrt(2) ],
+                  [ 0.5*math.sqrt(2), 0.0,              0.0,              0.5*math.sqrt(2) ],
+                  [-0.5*math.sqrt(2), 0.0,              0.5*math.sqrt(2), 0.0              ],
+                  [-0.5*math.sqrt(2), 0.0,             -0.5*math.sqrt(2), 0.0              ],
+                  [-0.5*math.sqrt(2), 0.5*math.sqrt(2), 0.0,              0.0              ],
+                  [-0.5*math.sqrt(2),-0.5*math.sqrt(2), 0.0,              0.0              ],
+                ]
+  elif lattice == 'hexagonal':
+    symQuats =  [
+                  [ 1.0,0.0,0.0,0.0 ],
+                  [-0.5*math.sqrt(3), 0.0, 0.0,-0.5 ],
+                  [ 0.5, 0.0, 0.0, 0.5*math.sqrt(3) ],
+                  [ 0.0,0.0,0.0,1.0 ],
+                  [-0.5, 0.0, 0.0, 0.5*math.sqrt(3) ],
+                  [-0.5*math.sqrt(3), 0.0, 0.0, 0.5 ],
+                  [ 0.0,1.0,0.0,0.0 ],
+                  [ 0.0,-0.5*math.sqrt(3), 0.5, 0.0 ],
+                  [ 0.0, 0.5,-0.5*math.sqrt(3), 0.0 ],
+                  [ 0.0,0.0,1.0,0.0 ],
+                  [ 0.0,-0.5,-0.5*math.sqrt(3), 0.0 ],
+                  [ 0.0, 0.5*math.sqrt(3), 0.5, 0.0 ],
+                ]
+  elif lattice == 'tetragonal':
+    symQuats =  [
+                  [ 1.0,0.0,0.0,0.0 ],
+                  [ 0.0,1.0,0.0,0.0 ],
+                  [ 0.0,0.0,1.0,0.0 ],
+                  [ 0.0,0.0,0.0,1.0 ],
+                  [ 0.0, 0.5*math.sqrt(2), 0.5*math.sqrt(2), 0.0 ],
+                  [ 0.0,-0.5*math.sqrt(2), 0.5*math.sqrt(2), 0.0 ],
+                  [ 0.5*math.sqrt(2), 0.0, 0.0, 0.5*math.sqrt(2) ],
+                  [-0.5*math.sqrt(2), 0.0, 0.0, 0.5*math.sqrt(2) ],
+                ]
+  elif lattice == 'orthorhombic':
+    symQuats =  [
+                  [ 1.0,0.0,0.0,0.0 ],
+                  [ 0.0,1.0,0.0,0.0 ],
+                  [ 0.0,0.0,1.0,0.0 ],
+                  [ 0.0,0.0,0.0,1.0 ],
+                ]
+  else:
+    symQuats =  [
+                  [ 1.0,0.0,0.0,0.0 ],
+                ]
+
+  if lattice == 'cubic':
+    SST = {'improper':np.array([ [-1.            ,  0.            ,  1. ],
+                                 [ np.sqrt(2.)   , -np.sqrt(2.)   ,  0. ],
+                                 [ 0.            ,  np.sqrt(3.)   ,  0. ] ]),
+           'proper':np.array([ [ 0.            , -1.            ,  1. ],
+                                 [-np.sqrt(2.)   , np.sqrt(2.)    ,  0. ],
+                                 [ np.sqrt(3.)   ,  0.            ,  0. ] ]),
+            }
+  elif lattice == 'hexagonal':
+    SST = {'improper':np.array([ [ 0.            ,  0.            ,  1. ],
+                                 [ 1.            , -np.sqrt(3.),     0. ],
+                                 [ 0.            ,  2.            ,  0. ] ]),
+           'proper':np.array([ [ 0.            ,  0.            ,  1. ],
+                                 [-1.            ,  np.sqrt(3.)   ,  0. ],
+                                 [ np.sqrt(3)    , -1.            ,  0. ] ]),
+            }
+  elif lattice == 'tetragonal':
+    SST = {'improper':np.array([ [ 0.            ,  0.            ,  1. ],
+                                 [ 1.            , -1.            ,  0. ],
+                                 [ 0.            ,  np.sqrt(2.),     0. ] ]),
+           'proper':np.array([ [ 0.            ,  0.            ,  1. ],
+                                 [-1.            ,  1.            ,  0. ],
+                                 [ np.sqrt(2.)   ,  0.            ,  0. ] ]),
+            }
+  elif lattice == 'orthorhombic':
+    SST = {'improper':np.array([ [ 0., 0., 1.],
+                                 [ 1., 0., 0.],
+                                 [ 0., 1., 0.] ]),
+           'proper':np.array([ [ 0., 0., 1.],
+                                 [-1., 0., 0.],
+                                 [ 0., 1., 0.] ]),
+            }
+  else:
+    SST = {'improper':np.zeros((3,3),dtype=float),
+           'proper':np.zeros((3,3),dtype=float),
+            }
+
+  if lattice == 'cubic':
+    FZ = [math.sqrt(2.0)-1.0, 1.0]
+  elif lattice == 'hexagonal':
+    FZ = [1.0, 2.0, math.sqrt(3)]
+  elif lattice == 'tetragonal':
+    FZ = [1.0, math.sqrt(2.0)]
+  elif lattice == 'orthorhombic':
+    FZ = [1.0]
+  else:
+    FZ = []
+
+  quaternions = QuaternionArray(symQuats).q
+  table = {'quaternions': quaternions,
+           'matrices':    QuaternionArray(quaternions,homomorph = False).asMatrix(),
+           'SST':         SST,
+           'FZ':          np.array(FZ),
+          }
+  for constant in [table['quaternions'],table['matrices'],table['FZ']] + list(SST.values()):
+    constant.flags.writeable = False
+
+  _symmetryTables[lattice] = table
+  return table
+
+
 # ******************************************************************************************
 class Symmetry:
 
@@ -590,80 +1067,20 @@ class Symmetry:
 
   def symmetryQuats(self,who = []):
     """List of symmetry operations as quaternions."""
-    if self.lattice == 'cubic':
-      symQuats =  [
-                    [ 1.0,              0.0,              0.0,              0.0              ],
-                    [ 0.0,              1.0,              0.0,              0.0              ],
-                    [ 0.0,              0.0,              1.0,              0.0              ],
-                    [ 0.0,              0.0,              0.0,              1.0              ],
-                    [ 0.0,              0.0,              0.5*math.sqrt(2), 0.5*math.sqrt(2) ],
-                    [ 0.0,              0.0,              0.5*math.sqrt(2),-0.5*math.sqrt(2) ],
-                    [ 0.0,              0.5*math.sqrt(2), 0.0,              0.5*math.sqrt(2) ],
-                    [ 0.0,              0.5*math.sqrt(2), 0.0,             -0.5*math.sqrt(2) ],
-                    [ 0.0,              0.5*math.sqrt(2),-0.5*math.sqrt(2), 0.0              ],
-                    [ 0.0,             -0.5*math.sqrt(2),-0.5*math.sqrt(2), 0.0              ],
-                    [ 0.5,              0.5,              0.5,              0.5              ],
-                    [-0.5,              0.5,              0.5,              0.5              ],
-                    [-0.5,              0.5,              0.5,             -0.5              ],
-                    [-0.5,              0.5,             -0.5,              0.5              ],
-                    [-0.5,             -0.5,              0.5,              0.5              ],
-                    [-0.5,             -0.5,              0.5,             -0.5              ],
-                    [-0.5,             -0.5,             -0.5,              0.5              ],
-                    [-0.5,              0.5,             -0.5,             -0.5              ],
-                    [-0.5*math.sqrt(2), 0.0,              0.0,              0.5*math.sqrt(2) ],
-                    [ 0.5*math.sqrt(2), 0.0,              0.0,              0.5*math.sqrt(2) ],
-                    [-0.5*math.sqrt(2), 0.0,              0.5*math.sqrt(2), 0.0              ],
-                    [-0.5*math.sqrt(2), 0.0,             -0.5*math.sqrt(2), 0.0              ],
-                    [-0.5*math.sqrt(2), 0.5*math.sqrt(2), 0.0,              0.0              ],
-                    [-0.5*math.sqrt(2),-0.5*math.sqrt(2), 0.0,              0.0              ],
-                  ]
-    elif self.lattice == 'hexagonal':
-      symQuats =  [
-                    [ 1.0,0.0,0.0,0.0 ],
-                    [-0.5*math.sqrt(3), 0.0, 0.0,-0.5 ],
-                    [ 0.5, 0.0, 0.0, 0.5*math.sqrt(3) ],
-                    [ 0.0,0.0,0.0,1.0 ],
-                    [-0.5, 0.0, 0.0, 0.5*math.sqrt(3) ],
-                    [-0.5*math.sqrt(3), 0.0, 0.0, 0.5 ],
-                    [ 0.0,1.0,0.0,0.0 ],
-                    [ 0.0,-0.5*math.sqrt(3), 0.5, 0.0 ],
-                    [ 0.0, 0.5,-0.5*math.sqrt(3), 0.0 ],
-                    [ 0.0,0.0,1.0,0.0 ],
-                    [ 0.0,-0.5,-0.5*math.sqrt(3), 0.0 ],
-                    [ 0.0, 0.5*math.sqrt(3), 0.5, 0.0 ],
-                  ]
-    elif self.lattice == 'tetragonal':
-      symQuats =  [
-                    [ 1.0,0.0,0.0,0.0 ],
-                    [ 0.0,1.0,0.0,0.0 ],
-                    [ 0.0,0.0,1.0,0.0 ],
-                    [ 0.0,0.0,0.0,1.0 ],
-                    [ 0.0, 0.5*math.sqrt(2), 0.5*math.sqrt(2), 0.0 ],
-                    [ 0.0,-0.5*math.sqrt(2), 0.5*math.sqrt(2), 0.0 ],
-                    [ 0.5*math.sqrt(2), 0.0, 0.0, 0.5*math.sqrt(2) ],
-                    [-0.5*math.sqrt(2), 0.0, 0.0, 0.5*math.sqrt(2) ],
-                  ]
-    elif self.lattice == 'orthorhombic':
-      symQuats =  [
-                    [ 1.0,0.0,0.0,0.0 ],
-                    [ 0.0,1.0,0.0,0.0 ],
-                    [ 0.0,0.0,1.0,0.0 ],
-                    [ 0.0,0.0,0.0,1.0 ],
-                  ]
-    else:
-      symQuats =  [
-                    [ 1.0,0.0,0.0,0.0 ],
-                  ]
+    symQuats = _symmetryTable(self.lattice)['quaternions']
 
     return list(map(Quaternion,
-               np.array(symQuats)[np.atleast_1d(np.array(who)) if who != [] else range(len(symQuats))]))
+               symQuats[np.atleast_1d(np.array(who)) if who != [] else range(len(symQuats))]))
     
     
   def equivalentQuaternions(self,
                             quaternion,
                             who = []):
     """List of symmetrically equivalent quaternions based on own symmetry."""
-    return [quaternion*q for q in self.symmetryQuats(who)]
+    symQuats = _symmetryTable(self.lattice)['quaternions']
+    if who != []: symQuats = symQuats[np.atleast_1d(np.array(who))]
+
+    return list(quaternion*QuaternionArray(symQuats,homomorph = False))
 
 
   def inFZ(self,R):
@@ -671,26 +1088,53 @@ class Symmetry:
     if isinstance(R, Quaternion): R = R.asRodrigues()                                               # translate accidentially passed quaternion
 # fundamental zone in Rodrigues space is point symmetric around origin
     R = abs(R)                                                                                      
+    FZ = _symmetryTable(self.lattice)['FZ']
     if self.lattice == 'cubic':
-      return     math.sqrt(2.0)-1.0 >= R[0] \
-             and math.sqrt(2.0)-1.0 >= R[1] \
-             and math.sqrt(2.0)-1.0 >= R[2] \
-             and 1.0 >= R[0] + R[1] + R[2]
+      return     FZ[0] >= R[0] \
+             and FZ[0] >= R[1] \
+             and FZ[0] >= R[2] \
+             and FZ[1] >= R[0] + R[1] + R[2]
     elif self.lattice == 'hexagonal':
-      return     1.0 >= R[0] and 1.0 >= R[1] and 1.0 >= R[2] \
-             and 2.0 >= math.sqrt(3)*R[0] + R[1] \
-             and 2.0 >= math.sqrt(3)*R[1] + R[0] \
-             and 2.0 >= math.sqrt(3) + R[2]
+      return     FZ[0] >= R[0] and FZ[0] >= R[1] and FZ[0] >= R[2] \
+             and FZ[1] >= FZ[2]*R[0] + R[1] \
+             and FZ[1] >= FZ[2]*R[1] + R[0] \
+             and FZ[1] >= FZ[2] + R[2]
     elif self.lattice == 'tetragonal':
-      return     1.0 >= R[0] and 1.0 >= R[1] \
-             and math.sqrt(2.0) >= R[0] + R[1] \
-             and math.sqrt(2.0) >= R[2] + 1.0
+      return     FZ[0] >= R[0] and FZ[0] >= R[1] \
+             and FZ[1] >= R[0] + R[1] \
+             and FZ[1] >= R[2] + FZ[0]
     elif self.lattice == 'orthorhombic':
-      return     1.0 >= R[0] and 1.0 >= R[1] and 1.0 >= R[2]
+      return     FZ[0] >= R[0] and FZ[0] >= R[1] and FZ[0] >= R[2]
     else:
       return True
 
 
+  def inFZArray(self,R):
+    """Mask of (...,3) Rodrigues vectors (or QuaternionArray, (...,4) quaternions) that fall into fundamental zone of own symmetry."""
+    if isinstance(R, QuaternionArray): R = R.q
+    if np.shape(R)[-1] == 4: R = _rodrigues(np.asarray(R))                                          # translate quaternions
+    R = np.abs(R)
+    FZ = _symmetryTable(self.lattice)['FZ']
+    if self.lattice == 'cubic':
+      return     (FZ[0] >= R[...,0]) \
+               & (FZ[0] >= R[...,1]) \
+               & (FZ[0] >= R[...,2]) \
+               & (FZ[1] >= R[...,0] + R[...,1] + R[...,2])
+    elif self.lattice == 'hexagonal':
+      return     (FZ[0] >= R[...,0]) & (FZ[0] >= R[...,1]) & (FZ[0] >= R[...,2]) \
+               & (FZ[1] >= FZ[2]*R[...,0] + R[...,1]) \
+               & (FZ[1] >= FZ[2]*R[...,1] + R[...,0]) \
+               & (FZ[1] >= FZ[2] + R[...,2])
+    elif self.lattice == 'tetragonal':
+      return     (FZ[0] >= R[...,0]) & (FZ[0] >= R[...,1]) \
+               & (FZ[1] >= R[...,0] + R[...,1]) \
+               & (FZ[1] >= R[...,2] + FZ[0])
+    elif self.lattice == 'orthorhombic':
+      return     (FZ[0] >= R[...,0]) & (FZ[0] >= R[...,1]) & (FZ[0] >= R[...,2])
+    else:
+      return np.ones(R.shape[:-1],dtype=bool)
+
+
   def inDisorientationSST(self,R):
     """
     Check whether given Rodrigues vector (of misorientation) falls into standard stereographic triangle of own symmetry.
@@ -718,6 +1162,33 @@ class Symmetry:
       return True
 
 
+  def inDisorientationSSTArray(self,R):
+    """
+    Mask of (...,3) Rodrigues vectors (or QuaternionArray, (...,4) quaternions) of misorientations that fall into standard stereographic triangle of own symmetry.
+
+    Array version of inDisorientationSST.
+    """
+    if isinstance(R, QuaternionArray): R = R.q
+    if np.shape(R)[-1] == 4: R = _rodrigues(np.asarray(R))                                          # translate quaternions
+    R = np.asarray(R)
+
+    epsilon = 0.0
+    if self.lattice == 'cubic':
+      return (R[...,0] >= R[...,1]+epsilon)                & (R[...,1] >= R[...,2]+epsilon) & (R[...,2] >= epsilon)
+
+    elif self.lattice == 'hexagonal':
+      return (R[...,0] >= math.sqrt(3)*(R[...,1]-epsilon)) & (R[...,1] >= epsilon)          & (R[...,2] >= epsilon)
+
+    elif self.lattice == 'tetragonal':
+      return (R[...,0] >= R[...,1]-epsilon)                & (R[...,1] >= epsilon)          & (R[...,2] >= epsilon)
+
+    elif self.lattice == 'orthorhombic':
+      return (R[...,0] >= epsilon)                         & (R[...,1] >= epsilon)          & (R[...,2] >= epsilon)
+
+    else:
+      return np.ones(R.shape[:-1],dtype=bool)
+
+
   def inSST(self,
             vector,
             proper = False,
@@ -742,42 +1213,7 @@ class Symmetry:
 #                                                       [0.,1.,0.]]).transpose()),                  # direction of blue
 #             }
 
-    if self.lattice == 'cubic':
-      basis = {'improper':np.array([ [-1.            ,  0.            ,  1. ],
-                                   [ np.sqrt(2.)   , -np.sqrt(2.)   ,  0. ],
-                                   [ 0.            ,  np.sqrt(3.)   ,  0. ] ]),
-             'proper':np.array([ [ 0.            , -1.            ,  1. ],
-                                   [-np.sqrt(2.)   , np.sqrt(2.)    ,  0. ],
-                                   [ np.sqrt(3.)   ,  0.            ,  0. ] ]),
-              }
-    elif self.lattice == 'hexagonal':
-      basis = {'improper':np.array([ [ 0.            ,  0.            ,  1. ],
-                                   [ 1.            , -np.sqrt(3.),     0. ],
-                                   [ 0.            ,  2.            ,  0. ] ]),
-             'proper':np.array([ [ 0.            ,  0.            ,  1. ],
-                                   [-1.            ,  np.sqrt(3.)   ,  0. ],
-                                   [ np.sqrt(3)    , -1.            ,  0. ] ]),
-              }
-    elif self.lattice == 'tetragonal':
-      basis = {'improper':np.array([ [ 0.            ,  0.            ,  1. ],
-                                   [ 1.            , -1.            ,  0. ],
-                                   [ 0.            ,  np.sqrt(2.),     0. ] ]),
-             'proper':np.array([ [ 0.            ,  0.            ,  1. ],
-                                   [-1.            ,  1.            ,  0. ],
-                                   [ np.sqrt(2.)   ,  0.            ,  0. ] ]),
-              }
-    elif self.lattice == 'orthorhombic':
-      basis = {'improper':np.array([ [ 0., 0., 1.],
-                                   [ 1., 0., 0.],
-                                   [ 0., 1., 0.] ]),
-             'proper':np.array([ [ 0., 0., 1.],
-                                   [-1., 0., 0.],
-                                   [ 0., 1., 0.] ]),
-              }
-    else:
-      basis = {'improper':np.zeros((3,3),dtype=float),
-             'proper':np.zeros((3,3),dtype=float),
-              }
+    basis = _symmetryTable(self.lattice)['SST']
 
     if np.all(basis == 0.0):
       theComponents = -np.ones(3,'d')
@@ -806,6 +1242,64 @@ class Symmetry:
     else:
       return inSST
 
+  def inSSTArray(self,
+                 vectors,
+                 proper = False,
+                 color = False):
+    """
+    Mask of (...,3) vectors that fall into standard stereographic triangle of own symmetry.
+
+    Array version of inSST, proper considers only vectors with z >= 0, hence uses two neighboring SSTs.
+    Return (...,3) inverse pole figure colors if requested.
+    """
+    basis = _symmetryTable(self.lattice)['SST']
+
+    v = np.array(vectors,dtype = float)
+    if proper:                                                                                      # check both improper ...
+      theComponents = np.einsum('ij,...j->...i',basis['improper'],v)
+      inSST = np.all(theComponents >= 0.0,axis=-1)
+      theComponents = np.einsum('ij,...j->...i',basis['proper'],v)                                  # ... and proper SST
+      inSST |= np.all(theComponents >= 0.0,axis=-1)
+    else:
+      v[...,2] = np.abs(v[...,2])                                                                   # z component projects identical
+      theComponents = np.einsum('ij,...j->...i',basis['improper'],v)                                # for positive and negative values
+      inSST = np.all(theComponents >= 0.0,axis=-1)
+
+    if color:                                                                                       # have to return color array
+      with np.errstate(invalid='ignore',divide='ignore'):
+        rgb = np.sqrt(theComponents/np.sqrt(np.einsum('...i,...i',theComponents,theComponents))[...,np.newaxis]) # smoothen color ramps
+        np.minimum(1.0,rgb,out = rgb)                                                               # limit to maximum intensity
+        rgb /= np.maximum(np.maximum(rgb[...,0],rgb[...,1]),rgb[...,2])[...,np.newaxis]             # normalize to (HS)V = 1
+      rgb[~inSST] = 0.0
+      return (inSST,rgb)
+    else:
+      return inSST
+
+  def SSTfolded(self,vectors):
+    """
+    (...,3) vectors mapped into the (improper) standard stereographic triangle of own symmetry.
+
+    Closed-form folding by the Laue group of the lattice, yields the same SST location as
+    searching the symmetrically equivalent directions (as done by inSST and IPFcolor).
+    """
+    v = np.abs(np.array(vectors,dtype = float))                                                     # all Laue groups contain the three mirrors of mmm
+    if self.lattice == 'cubic':
+      xy = np.minimum(v[...,0],v[...,1])
+      XY = np.maximum(v[...,0],v[...,1])
+      v  = np.stack([np.maximum(xy,np.minimum(XY,v[...,2])),
+                     np.minimum(xy,v[...,2]),
+                     np.maximum(XY,v[...,2])],axis=-1)                                              # z >= x >= y >= 0
+    elif self.lattice == 'hexagonal':
+      phi = np.arctan2(v[...,1],v[...,0]) % (np.pi/3.)                                              # 60 deg periodicity ...
+      phi = np.where(phi > np.pi/6.,np.pi/3.-phi,phi)                                               # ... with mirror at 30 deg
+      r   = np.hypot(v[...,0],v[...,1])
+      v   = np.stack([r*np.cos(phi),r*np.sin(phi),v[...,2]],axis=-1)
+    elif self.lattice == 'tetragonal':
+      v = np.stack([np.maximum(v[...,0],v[...,1]),np.minimum(v[...,0],v[...,1]),v[...,2]],axis=-1) # x >= y >= 0
+    elif self.lattice is None:
+      v = np.array(vectors,dtype = float)
+    return v
+
 # code derived from http://pyeuclid.googlecode.com/svn/trunk/euclid.py
 # suggested reading: http://web.mit.edu/2.998/www/QuaternionReport1.pdf
 
@@ -976,21 +1470,15 @@ class Orientation:
          b = Orientation(Eulers=np.radians([20, 0, 0]),  symmetry='hexagonal')
          avg = Orientation.average([a,b])
     """
+    if isinstance(orientations, OrientationArray): return orientations.average(multiplicity)
+
     if not all(isinstance(item, Orientation) for item in orientations):
       raise TypeError("Only instances of Orientation can be averaged.")
+    if not all(item.symmetry == orientations[0].symmetry for item in orientations):
+      raise TypeError('disorientation between different symmetry classes not supported yet.')
 
-    N = len(orientations)
-    if multiplicity == [] or not multiplicity:
-      multiplicity = np.ones(N,dtype='i')
-
-    reference = orientations[0]                                                                     # take first as reference
-    for i,(o,n) in enumerate(zip(orientations,multiplicity)):
-      closest = o.equivalentOrientations(reference.disorientation(o,SST = False)[2])[0]             # select sym orientation with lowest misorientation
-      M = closest.quaternion.asM() * n if i == 0 else M + closest.quaternion.asM() * n              # noqa add (multiples) of this orientation to average noqa
-    eig, vec = np.linalg.eig(M/N)
-
-    return Orientation(quaternion = Quaternion(quatArray = np.real(vec.T[eig.argmax()])),
-                       symmetry = reference.symmetry.lattice)
+    return OrientationArray(quaternion = [o.quaternion.asList() for o in orientations],
+                            symmetry = orientations[0].symmetry.lattice).average(multiplicity)
 
 
   def related(self,
@@ -1245,3 +1733,401 @@ class Orientation:
     rot=np.dot(otherMatrix,myMatrix.T)
 
     return Orientation(matrix=np.dot(rot,self.asMatrix()))                                      # no symmetry information ??
+
+
+# ******************************************************************************************
+class OrientationArray:
+  """
+  N orientations of common lattice symmetry
+
+  Batched counterpart of Orientation backed by a QuaternionArray.
+  Symmetry-related methods work on blocks of rows to bound the size of intermediate arrays.
+  """
+
+  __slots__ = ['quaternion','symmetry']
+
+  blockSize = 2**14                                                                                 # rows per block in symmetry-expanded evaluations
+
+  sampleAxes = {'RD': [1.0,0.0,0.0],
+                'TD': [0.0,1.0,0.0],
+                'ND': [0.0,0.0,1.0],
+               }
+
+  def __init__(self,
+               quaternion = None,
+               Rodrigues  = None,
+               angleAxis  = None,
+               matrix     = None,
+               Eulers     = None,
+               symmetry   = None,
+               degrees    = False,
+              ):
+    if Eulers is not None:                                                                          # based on given (N,3) Euler angles
+      self.quaternion = QuaternionArray.fromEulers(Eulers,type='bunge',degrees=degrees)
+    elif matrix is not None:                                                                        # based on given (N,3,3) rotation matrices
+      self.quaternion = QuaternionArray.fromMatrix(matrix)
+    elif angleAxis is not None:                                                                     # based on given (N,4) angles and rotation axes
+      self.quaternion = QuaternionArray.fromAngleAxis(angleAxis,degrees=degrees)
+    elif Rodrigues is not None:                                                                     # based on given (N,3) Rodrigues vectors
+      self.quaternion = QuaternionArray.fromRodrigues(Rodrigues)
+    elif isinstance(quaternion, QuaternionArray):                                                   # based on given quaternions
+      self.quaternion = quaternion.homomorphed()
+    elif quaternion is not None:                                                                    # based on given (N,4) quaternion-like array
+      self.quaternion = QuaternionArray(quaternion)
+    else:
+      self.quaternion = QuaternionArray.fromIdentity()
+
+    self.symmetry = Symmetry(symmetry.lattice if isinstance(symmetry, Symmetry) else symmetry)
+
+  def __len__(self):
+    """number of orientations"""
+    return len(self.quaternion)
+
+  def __getitem__(self, item):
+    """Orientation for integer index, OrientationArray for slices, masks, and index arrays"""
+    if isinstance(item, (int,np.integer)):
+      return Orientation(quaternion=self.quaternion[item],symmetry=self.symmetry.lattice)
+    return self.__class__(quaternion=self.quaternion[item],symmetry=self.symmetry.lattice)
+
+  def __repr__(self):
+    """summary"""
+    return 'Symmetry: %s\n' % (self.symmetry) + \
+           'Orientations: %i' % (len(self))
+
+  def _blocks(self):
+    """row slices of at most blockSize rows"""
+    return [slice(i,i+self.blockSize) for i in range(0,len(self),self.blockSize)]
+
+  def asQuaternion(self):
+    return self.quaternion.asArray()
+
+  def asEulers(self,
+               type = 'bunge',
+               degrees = False,
+               standardRange = False):
+    return self.quaternion.asEulers(type, degrees, standardRange)
+
+  def asRodrigues(self):
+    return self.quaternion.asRodrigues()
+
+  def asAngleAxis(self,
+                  degrees = False):
+    return self.quaternion.asAngleAxis(degrees)
+
+  def asMatrix(self):
+    return self.quaternion.asMatrix()
+
+  def inFZ(self):
+    return self.symmetry.inFZArray(self.quaternion.asRodrigues())
+
+  def equivalentQuaternions(self,
+                            who = []):
+    """(N,S,4) array of symmetrically equivalent quaternions"""
+    symQuats = _symmetryTable(self.symmetry.lattice)['quaternions']
+    if who != []: symQuats = symQuats[np.atleast_1d(np.array(who))]
+
+    return _multiply(self.quaternion.q[:,np.newaxis,:],symQuats[np.newaxis,:,:])
+
+  def operatedQuaternions(self,
+                          operators):
+    """(N,4) array of each orientation's quaternion under its own symmetry operator"""
+    symQuats = _symmetryTable(self.symmetry.lattice)['quaternions']
+
+    return _multiply(self.quaternion.q,symQuats[np.asarray(operators)])
+
+  def reduced(self):
+    """
+    Transform orientations to fall into fundamental zone according to symmetry
+
+    returns reduced orientations and index of the (first) symmetry operator that achieved it
+    """
+    symQuats = _symmetryTable(self.symmetry.lattice)['quaternions']
+    reduced  = np.empty_like(self.quaternion.q)
+    symOps   = np.empty(len(self),dtype=int)
+
+    for block in self._blocks():
+      candidates = _multiply(self.quaternion.q[block,np.newaxis,:],symQuats[np.newaxis,:,:])       # all N x S products at once
+      inFZ = self.symmetry.inFZArray(candidates)
+      symOps[block]  = np.where(inFZ.any(axis=1),inFZ.argmax(axis=1),len(symQuats)-1)             # first hit, or last candidate if none (as in Orientation.reduced)
+      reduced[block] = candidates[np.arange(len(candidates)),symOps[block]]
+
+    return (self.__class__(quaternion=reduced,symmetry=self.symmetry.lattice),
+            symOps)
+
+
+  def disorientation(self,
+                     other,
+                     SST = True):
+    """
+    Disorientations between my orientations and the (aligned) other orientations.
+
+    Rotation axes fall into SST if SST == True.
+    Returns the same as Orientation.disorientation, but for N pairs:
+    disorientations, own sym, other sym, self-->other: True, self<--other: False
+    Angles and axes are obtained from asAngleAxis() of the disorientations.
+    """
+    if self.symmetry != other.symmetry: raise TypeError('disorientation between different symmetry classes not supported yet.')
+    if isinstance(other, Orientation): other = self.__class__(quaternion=other.quaternion.asList(),symmetry=other.symmetry)
+    if 1 not in [len(self),len(other)] and len(self) != len(other):
+      raise ValueError('disorientation requires aligned orientation arrays.')
+
+    mySymQs    = _symmetryTable(self.symmetry.lattice)['quaternions'] if SST else \
+                 _symmetryTable(self.symmetry.lattice)['quaternions'][:1]                         # take all or only first sym operation
+    otherSymQs = _symmetryTable(other.symmetry.lattice)['quaternions']
+    N = max(len(self),len(other))
+
+    theQ = np.empty((N,4))
+    i    = np.empty(N,dtype=int)
+    j    = np.empty(N,dtype=int)
+    k    = np.empty(N,dtype=int)
+    for block in [slice(b,b+self.blockSize) for b in range(0,N,self.blockSize)]:
+      myQ    = self.quaternion.q[block]  if len(self)  > 1 else self.quaternion.q
+      otherQ = other.quaternion.q[block] if len(other) > 1 else other.quaternion.q
+      misQ = myQ.copy()
+      misQ[:,1:] *= -1.0
+      misQ = _multiply(misQ,otherQ)
+      misQ = np.broadcast_to(misQ,(len(range(N)[block]),4))
+
+      todo = np.arange(len(misQ))                                                                   # rows still searching
+      for a,sA in enumerate(mySymQs):
+        sAconj = sA.copy()
+        sAconj[1:] *= -1.0
+        left = _multiply(sAconj,misQ[todo])
+        n = len(todo)
+        r = np.arange(n)
+        breaker = np.zeros((n,len(otherSymQs),2),dtype=bool)                                        # (n,j,k) in order of the scalar loops
+
+        w = np.abs(np.dot(left,otherSymQs.T*np.array([[1.0],[-1.0],[-1.0],[-1.0]])))               # real parts of all (n,j) candidates
+        best = w.argmax(axis=1)                                                                     # FZ is the Voronoi cell of the identity ...
+        wBest = w[r,best]
+        w[r,best] = -1.0
+        bestQ = _multiply(left,otherSymQs[best])
+        ambiguous = (wBest - w.max(axis=1) < 1e-9) | ~self.symmetry.inFZArray(bestQ)               # ... unless close to its boundary
+
+        clear = r[~ambiguous]
+        if SST:
+          R = _rodrigues(bestQ[clear])
+          breaker[clear,best[clear],1] = other.symmetry.inDisorientationSSTArray(R)
+          breaker[clear,best[clear],0] = other.symmetry.inDisorientationSSTArray(-R)               # first try is conjugated
+        else:
+          breaker[clear,best[clear],0] = True
+
+        unclear = r[ambiguous]
+        if len(unclear) > 0:                                                                        # test all candidates
+          candidates = _multiply(left[unclear,np.newaxis,:],otherSymQs[np.newaxis,:,:])
+          inFZ = self.symmetry.inFZArray(candidates)                                                # invariant under conjugation
+          if SST:
+            hits = np.nonzero(inFZ)
+            R = _rodrigues(candidates[hits])
+            breaker[(unclear[hits[0]],hits[1],1)] = other.symmetry.inDisorientationSSTArray(R)
+            breaker[(unclear[hits[0]],hits[1],0)] = other.symmetry.inDisorientationSSTArray(-R)
+          else:
+            breaker[unclear,:,0] = inFZ
+
+        breaker = breaker.reshape(n,-1)
+        found = breaker.any(axis=1) | (a == len(mySymQs)-1)                                         # last candidate if none (as in Orientation.disorientation)
+        first = np.where(breaker.any(axis=1),breaker.argmax(axis=1),breaker.shape[1]-1)[found]
+        rows  = todo[found]
+        theQ[block][rows] = _multiply(left[found],otherSymQs[first//2])
+        theQ[block][rows[first%2 == 0],1:] *= -1.0
+        i[block][rows] = a
+        j[block][rows] = first//2
+        k[block][rows] = first%2
+        todo = todo[~found]
+        if len(todo) == 0: break
+
+    return (self.__class__(quaternion=theQ,symmetry=self.symmetry.lattice),
+            i,j,k == 1)
+
+  def average(self,
+              multiplicity = []):
+    """
+    average orientation (see Orientation.average)
+
+    Closest symmetric equivalents to the first orientation are selected at once
+    and the (weighted) sum of quaternion outer products is a single contraction.
+    """
+    if multiplicity is None or len(multiplicity) == 0:
+      multiplicity = np.ones(len(self),dtype='i')
+
+    symQuats = _symmetryTable(self.symmetry.lattice)['quaternions']
+    closest  = _multiply(self.quaternion.q,
+                         symQuats[self[:1].disorientation(self,SST = False)[2]])                   # select sym orientation with lowest misorientation to first
+    M = np.einsum('n,ni,nj->ij',multiplicity,closest,closest)                                      # add (multiples) of all orientations
+    eig, vec = np.linalg.eig(M/len(self))
+
+    return Orientation(quaternion = Quaternion(quatArray = np.real(vec.T[eig.argmax()])),
+                       symmetry = self.symmetry.lattice)
+
+  def groupedAverage(self,
+                     labels,
+                     multiplicity = []):
+    """
+    average orientation of each group of orientations sharing the same (integer) label
+
+    Same as calling average for each group, but in one pass over all orientations.
+    Returns unique labels, their average orientations, and their number of orientations.
+    """
+    if multiplicity is None or len(multiplicity) == 0:
+      multiplicity = np.ones(len(self),dtype='i')
+
+    unique,first,group,counts = np.unique(labels,return_index=True,return_inverse=True,return_counts=True)
+    symQuats = _symmetryTable(self.symmetry.lattice)['quaternions']
+    closest  = _multiply(self.quaternion.q,
+                         symQuats[self[first[group]].disorientation(self,SST = False)[2]])          # select sym orientation with lowest misorientation to first of group
+
+    M = np.empty((len(unique),4,4))
+    for a in range(4):
+      for b in range(a,4):                                                                          # segmented sums of (multiples) of symmetric outer products
+        M[:,a,b] = M[:,b,a] = np.bincount(group,weights=multiplicity*closest[:,a]*closest[:,b],minlength=len(unique))
+    eig, vec = np.linalg.eig(M/counts[:,np.newaxis,np.newaxis])
+
+    return (unique,
+            self.__class__(quaternion=np.real(vec[np.arange(len(unique)),:,eig.real.argmax(axis=1)]),
+                           symmetry=self.symmetry.lattice),
+            counts)
+
+  def inversePole(self,
+                  axes,
+                  proper = False,
+                  SST = True,
+                  normalize = False):
+    """
+    axes rotated according to orientations (using crystal symmetry to ensure location falls into SST)
+
+    axes are given as (3,) or (K,3) array or as (list of) names of sample axes ('RD', 'TD', 'ND').
+    returns (N,K,3) poles and (N,K) indices of the symmetry operator used (first in SST as in Orientation.inversePole).
+    All axes share the same set of symmetry products.
+    Poles are rescaled to unit length (same as np.linalg.norm of each individual pole) if normalize == True.
+    """
+    if isinstance(axes, str): axes = [axes]
+    axes = np.array([self.sampleAxes[a] if isinstance(a, str) else a for a in axes] \
+                    if not isinstance(axes, np.ndarray) else axes,dtype='d').reshape(-1,3)
+
+    symQuats = _symmetryTable(self.symmetry.lattice)['quaternions'] if SST else QuaternionArray().q
+    poles    = np.empty((len(self),len(axes),3))
+    symOps   = np.zeros((len(self),len(axes)),dtype=int)
+
+    for block in self._blocks():
+      candidates = _multiply(self.quaternion.q[block,np.newaxis,:],symQuats[np.newaxis,:,:])
+      candidates[...,1:] *= -1.0                                                                    # conjugate to align crystal direction to axis
+      candidatePoles = _rotate(candidates[:,:,np.newaxis,:],axes[np.newaxis,np.newaxis,:,:])        # (n,S,K,3)
+      if SST:
+        inSST = self.symmetry.inSSTArray(candidatePoles,proper)                                     # (n,S,K)
+        symOps[block] = np.where(inSST.any(axis=1),inSST.argmax(axis=1),len(symQuats)-1)
+      n = len(candidates)
+      poles[block] = candidatePoles[np.arange(n)[:,np.newaxis],symOps[block],np.arange(len(axes))[np.newaxis,:]]
+
+    if normalize: poles /= _norm(poles)[...,np.newaxis]
+
+    return (poles,symOps)
+
+  def IPFcolor(self,
+               axis,
+               dtype = 'float32'):
+    """
+    (N,3) TSL colors of inverse pole figure for given axis
+
+    float dtypes give intensities in [0,1], uint8 gives [0,255] for direct use as image buffer.
+    """
+    if isinstance(axis, str): axis = self.sampleAxes[axis]
+    axis = np.array(axis,dtype='d')
+
+    rgb = np.empty((len(self),3),dtype=dtype)
+    for block in self._blocks():
+      w,x,y,z = self.quaternion.q[block].T
+      poles = np.zeros((3,len(w)))                                                                  # crystal direction parallel to axis, i.e. M^T.axis
+      if axis[0] != 0.0: poles += axis[0]*np.array([1.0-2.0*(y*y+z*z),2.0*(x*y-z*w),2.0*(x*z+y*w)])
+      if axis[1] != 0.0: poles += axis[1]*np.array([2.0*(x*y+z*w),1.0-2.0*(x*x+z*z),2.0*(y*z-x*w)])
+      if axis[2] != 0.0: poles += axis[2]*np.array([2.0*(x*z-y*w),2.0*(x*w+y*z),1.0-2.0*(x*x+y*y)])
+      inSST,color = self.symmetry.inSSTArray(self.symmetry.SSTfolded(poles.T),color=True)
+      color[~np.isfinite(color)] = 0.0                                                              # no color without symmetry
+      rgb[block] = np.round(255.*color) if np.dtype(dtype) == np.uint8 else color
+
+    return rgb
+
+  def _pairBlocks(self,
+                  memory,
+                  bytesPerPair):
+    """(rows,cols,mask) of square blocks covering all pairs i < j with at most memory/bytesPerPair pairs each"""
+    size = max(1,int(math.sqrt(memory/float(bytesPerPair))))
+    for a in range(0,len(self),size):
+      for b in range(a,len(self),size):
+        rows = slice(a,min(a+size,len(self)))
+        cols = slice(b,min(b+size,len(self)))
+        mask = np.arange(rows.start,rows.stop)[:,np.newaxis] < np.arange(cols.start,cols.stop)[np.newaxis,:] \
+               if a == b else None                                                                  # upper triangle of diagonal blocks
+        yield (rows,cols,mask)
+
+  def _misorientationAngles(self,
+                            rows,
+                            cols):
+    """(n,m) disorientation angles between orientations in rows and cols"""
+    symQuats = _symmetryTable(self.symmetry.lattice)['quaternions']
+    equivalents = _multiply(self.quaternion.q[np.newaxis,cols,:],symQuats[:,np.newaxis,:])          # (S,m,4)
+    w = np.dot(self.quaternion.q[rows],equivalents.reshape(-1,4).T)                                 # real part of a^-1.b.s is a.(b.s)
+    w = np.abs(w,out = w).reshape(w.shape[0],len(symQuats),-1).max(axis=1)                          # angle(sA^-1.m.sB) = angle(m.sB.sA^-1), i.e. smallest over m.S
+    return 2.0*np.arccos(np.minimum(1.0,w))
+
+  def misorientationDistribution(self,
+                                 bins = 90,
+                                 degrees = False,
+                                 axisBins = None,
+                                 memory = 2**28):
+    """
+    Histogram of disorientation angles of all pairs of orientations (MDF)
+
+    bins are given as number of bins in [0,180] deg or as bin edges (like numpy.histogram).
+    If axisBins is given, a (axisBins,axisBins) histogram of the stereographic projections
+    of the disorientation axes (within SST) is also returned.
+    Pairs are processed in blocks of about memory bytes.
+    """
+    symQuats = _symmetryTable(self.symmetry.lattice)['quaternions']
+    toRadians = math.pi/180.0 if degrees else 1.0
+    edges = np.linspace(0.0,math.pi,bins+1) if np.isscalar(bins) else np.array(bins,dtype='d')*toRadians
+    counts = np.zeros(len(edges)-1,dtype=int)
+    axisCounts = np.zeros((axisBins,axisBins),dtype=int) if axisBins is not None else None
+
+    for rows,cols,mask in self._pairBlocks(memory,8*(len(symQuats)+(32 if axisBins is not None else 8))):
+      if axisBins is None:
+        angles = self._misorientationAngles(rows,cols)
+        counts += np.histogram(angles if mask is None else angles[mask],
+                               *((bins,(0.0,math.pi)) if np.isscalar(bins) else (edges,)))[0]     # equal bins are much faster
+      else:
+        ii,jj = np.nonzero(mask) if mask is not None else \
+                np.nonzero(np.ones((rows.stop-rows.start,cols.stop-cols.start),dtype=bool))
+        disorientations = self[ii+rows.start].disorientation(self[jj+cols.start])[0]
+        angles,axes = disorientations.asAngleAxis()
+        counts     += np.histogram(angles,edges)[0]
+        axisCounts += np.histogram2d(axes[:,0]/(1.0+axes[:,2]),axes[:,1]/(1.0+axes[:,2]),
+                                     axisBins,[[-1.0,1.0],[-1.0,1.0]])[0].astype(int)
+
+    edges /= toRadians
+    return (counts,edges) if axisBins is None else (counts,edges,axisCounts)
+
+  def neighbors(self,
+                threshold,
+                degrees = False,
+                memory = 2**28):
+    """
+    Sparse list of all pairs of orientations with disorientation angle below threshold
+
+    returns indices i < j and disorientation angles of these pairs.
+    Pairs are processed in blocks of about memory bytes.
+    """
+    symQuats = _symmetryTable(self.symmetry.lattice)['quaternions']
+    toRadians = math.pi/180.0 if degrees else 1.0
+    I,J,A = [],[],[]
+
+    for rows,cols,mask in self._pairBlocks(memory,8*(len(symQuats)+8)):
+      angles = self._misorientationAngles(rows,cols)
+      close  = angles < threshold*toRadians
+      if mask is not None: close &= mask
+      ii,jj = np.nonzero(close)
+      I.append(ii+rows.start)
+      J.append(jj+cols.start)
+      A.append(angles[ii,jj]/toRadians)
+
+    return (np.concatenate(I+[np.empty(0,dtype=int)]),
+            np.concatenate(J+[np.empty(0,dtype=int)]),
+            np.concatenate(A+[np.empty(0)]))
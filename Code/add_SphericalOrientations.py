@@ -8,7 +8,8 @@
 
 
 import Spherical
-import os,sys,string
+import os,sys,string,StringIO
+import multiprocessing,collections
 from optparse import OptionParser
 import numpy as np
 import math
@@ -55,8 +56,20 @@ parser.add_option('-q', '--quaternion',
                   type = 'string', metavar = 'string',
                   help = 'quaternion label')
 
+parser.add_option('--chunk',
+                  dest = 'chunk',
+                  type = 'int', metavar = 'int',
+                  help = 'process blocks of N rows at once (0 = row by row) [%default]')
+
+parser.add_option('-j', '--jobs',
+                  dest = 'jobs',
+                  type = 'int', metavar = 'int',
+                  help = 'number of files (or row blocks of single file) processed in parallel [%default]')
+
 parser.set_defaults(symmetry = Spherical.Symmetry.lattices[-1],
                     degrees = False,
+                    chunk = 0,
+                    jobs = 1,
                    )
 
 (options, filenames) = parser.parse_args()
@@ -78,15 +91,56 @@ if np.sum(input) != 1: parser.error('needs exactly one input format.')
                         ][np.where(input)[0][0]]                                                    # select input label that was requested
 toRadians = math.pi/180.0 if options.degrees else 1.0                                               # rescale degrees to radians
 
-# --- loop over input files ------------------------------------------------------------------------
-
-if filenames == []: filenames = [None]
-
-for name in filenames:
+# --- convert block of rows ------------------------------------------------------------------------
+
+def blockValues(rows,column):
+  """(rows x components) array of input values"""
+  if inputtype == 'frame':
+    return np.array([map(float,row[column[0]:column[0]+3] + \
+                               row[column[1]:column[1]+3] + \
+                               row[column[2]:column[2]+3]) for row in rows])
+  else:
+    return np.array([map(float,row[column:column+np.prod(dim)]) for row in rows])
+
+def convert(values):
+  """spherical Euler angles (as output strings) for block of input values"""
+  if inputtype == 'eulers':
+    o = Spherical.OrientationArray(Eulers   = values*toRadians,
+                                   symmetry = options.symmetry)
+  elif inputtype == 'matrix':
+    o = Spherical.OrientationArray(matrix   = values.reshape(-1,3,3).transpose(0,2,1),
+                                   symmetry = options.symmetry)
+  elif inputtype == 'frame':
+    o = Spherical.OrientationArray(matrix   = values.reshape(-1,3,3),
+                                   symmetry = options.symmetry)
+  elif inputtype == 'quaternion':
+    o = Spherical.OrientationArray(quaternion = values,
+                                   symmetry   = options.symmetry)
+  o = o.reduced()[0]
+  vector,symOp = o.inversePole([0.,0.,1.], proper=True, normalize=True)
+  vector,symOp = vector[:,0],symOp[:,0]
+  zeta = np.arctan2(vector[:,1],vector[:,0])
+  eta  = np.arccos(vector[:,2])
+  c = Spherical.OrientationArray(Eulers=np.array([1.5 * np.pi + zeta, eta, 0.5 * np.pi - zeta]).T, symmetry=options.symmetry) # Claudio's convention
+  theta,axis = (c.quaternion * \
+                Spherical.QuaternionArray(o.operatedQuaternions(symOp)).conjugated()
+               ).asAngleAxis(degrees=options.degrees)
+  theta[axis[:,2] < 0.0] *= -1
+  if options.degrees:
+    zeta,eta = np.degrees([zeta,eta])
+  else:
+    theta = theta.tolist()                                                                          # same representation as row by row
+
+  return [map(str,item) for item in zip(zeta,eta,theta)]
+
+# --- process single input file --------------------------------------------------------------------
+
+def process(name):
   try:
     table = Spherical.ASCIItable(name = name,
-                              buffered = False)
-  except: continue
+                              buffered = False,
+                              bufferBytes = 2**20)                                                  # write in blocks of 1 MB
+  except: return
   Spherical.util.report(scriptName,name)
 
 # ------------------------------------------ read header ------------------------------------------
@@ -98,7 +152,7 @@ for name in filenames:
   if not np.all(table.label_dimension(label) == dim):
     Spherical.util.croak('input {} has wrong dimension {}.'.format(label,dim))
     table.close(dismiss = True)                                                                     # close ASCIItable and remove empty file
-    continue
+    return
 
   column = table.label_index(label)
 
@@ -111,7 +165,31 @@ for name in filenames:
 # ------------------------------------------ process data ------------------------------------------
 
   outputAlive = True
-  while outputAlive and table.data_read():                                                          # read next data line of ASCII table
+  blockwise = options.chunk > 0 or shardRows
+  if blockwise:
+    pool    = multiprocessing.Pool(options.jobs) if shardRows else None                             # workers for row blocks
+    pending = collections.deque()                                                                   # blocks in original order
+    size    = options.chunk if options.chunk > 0 else 4096
+    reading = True
+    while outputAlive and (reading or len(pending) > 0):
+      if reading:
+        rows = []
+        while len(rows) < size and table.data_read(): rows.append(table.data)                       # read next block of data lines
+        reading = len(rows) == size
+        if rows != []:
+          values = blockValues(rows,column)
+          pending.append((rows,values,pool.apply_async(convert,(values,)) if pool else None))
+
+      while len(pending) > (2*options.jobs if reading and pool else 0) and outputAlive:             # bounded number of blocks in flight
+        rows,values,result = pending.popleft()
+        table.data = [row + item for row,item in zip(rows,result.get() if result else convert(values))]
+        outputAlive = table.data_write()                                                            # output processed block
+
+    if pool:
+      pool.terminate()
+      pool.join()
+
+  while not blockwise and outputAlive and table.data_read():                                        # read next data line of ASCII table
     if inputtype == 'eulers':
       o = Spherical.Orientation(Eulers   = np.array(map(float,table.data[column:column+3]))*toRadians,
                              symmetry = options.symmetry).reduced()
@@ -143,3 +221,26 @@ for name in filenames:
 
   table.close()                                                                                     # close ASCII tables
 
+def processGrouped(name):
+  """process file while collecting its report and croak output"""
+  stderr = sys.stderr
+  sys.stderr = StringIO.StringIO()
+  try:
+    process(name)
+    return sys.stderr.getvalue()
+  finally:
+    sys.stderr = stderr
+
+# --- loop over input files ------------------------------------------------------------------------
+
+if filenames == []: filenames = [None]
+shardRows = options.jobs > 1 and len(filenames) == 1                                                # parallelize over rows of single table
+
+if options.jobs > 1 and len(filenames) > 1 and None not in filenames:
+  pool = multiprocessing.Pool(min(options.jobs,len(filenames)))
+  for messages in pool.imap(processGrouped,filenames):                                              # report in order of files
+    sys.stderr.write(messages)
+  pool.close()
+  pool.join()
+else:
+  for name in filenames: process(name)
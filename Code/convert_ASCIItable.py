@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+
+###########################################################################
+# Authors                                                                 #
+# Aritra Chakraborty                                                      #
+# Philip Eisenlohr                                                        #
+###########################################################################
+
+
+import Spherical
+import os,sys,string
+from optparse import OptionParser
+
+scriptID   = string.replace('$Id: convert_ASCIItable.py 61 2015-09-12 17:53:29Z chakra34 $','\n','\\n')
+scriptName = os.path.splitext(scriptID.split()[1])[0]
+
+
+parser = OptionParser(option_class=Spherical.extendableOption, usage='%prog options [file[s]]', description = """
+Converts ASCII tables to binary (columnar, memory-mappable) tables and back.
+Binary tables are written to "name.bin", text tables to "name.txt".
+
+""", version = scriptID)
+
+parser.add_option('-b', '--binary',
+                  dest = 'binary',
+                  action = 'store_true',
+                  help = 'convert text to binary table [%default]')
+parser.add_option('-t', '--type',
+                  dest = 'dtype',
+                  type = 'choice', choices = ['float64','float32'], metavar='string',
+                  help = 'data type of binary table [%default] {float64, float32}')
+parser.add_option('--chunk',
+                  dest = 'chunk',
+                  type = 'int', metavar = 'int',
+                  help = 'number of rows converted at once [%default]')
+
+parser.set_defaults(binary = False,
+                    dtype  = 'float64',
+                    chunk  = 65536,
+                   )
+
+(options, filenames) = parser.parse_args()
+
+if filenames == []: parser.error('binary tables require file names.')
+
+# --- loop over input files ------------------------------------------------------------------------
+
+for name in filenames:
+  outname = os.path.splitext(name)[0] + ('.bin' if options.binary else '.txt')
+  if outname == name:
+    Spherical.util.croak('input {} would be overwritten.'.format(name))
+    continue
+  try:
+    table = Spherical.ASCIItable(name = name,
+                                 outname = outname if not options.binary else None,
+                                 buffered = False,
+                                 readonly = options.binary)
+  except: continue
+  Spherical.util.report(scriptName,name)
+
+# ------------------------------------------ read header ------------------------------------------
+
+  table.head_read()
+
+# ------------------------------------------ convert data -----------------------------------------
+
+  if options.binary:
+    table.data_writeBinary(outname,dtype = options.dtype,rows = options.chunk)
+  else:
+    table.head_write()
+    for table.data in table.data_readChunks(rows = options.chunk):
+      table.data_writeArray()
+
+# ------------------------------------------ output finalization -----------------------------------
+
+  table.close()                                                                                     # close ASCII tables
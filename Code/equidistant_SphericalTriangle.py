@@ -11,13 +11,6 @@ import string
 from optparse import OptionParser
 import numpy as np
 from subprocess import call
-import math
-
-global listAngles
-listAngles = []
-
-global listCoords
-listCoords = []
 
 scriptID   = string.replace('$Id: equidistant_SphericalTriangle.py 476 2017-06-15 15:22:25Z chakra34 $','\n','\\n')
 scriptName = os.path.splitext(scriptID.split()[1])[0]
@@ -25,6 +18,8 @@ scriptName = os.path.splitext(scriptID.split()[1])[0]
 
 parser = OptionParser(option_class=Spherical.extendableOption, usage='%prog options [file[s]]', description = """
 Discretizes a spherical triangle equally based on degrees of runs.
+Alternatively discretizes all standard triangles of the lattice or the faces of an icosahedron,
+merging points shared by adjacent triangles.
 
 """, version = scriptID)
 
@@ -33,6 +28,36 @@ parser.add_option('--degrees',
                   type = 'int',
                   help = 'number of times discretizations to be done [3]')
 
+parser.add_option('--gap',
+                  dest = 'gap',
+                  type = 'float', metavar = 'float',
+                  help = 'refine adaptively until no spacing exceeds this angle in degrees (overrides --degrees)')
+
+parser.add_option('--points',
+                  dest = 'points',
+                  type = 'int', metavar = 'int',
+                  help = 'refine adaptively as finely as possible with at most this many points (overrides --gap)')
+
+parser.add_option('--dry',
+                  dest = 'dry',
+                  action = 'store_true',
+                  help = 'only report number of points and memory estimate [%default]')
+
+parser.add_option('--cache',
+                  dest = 'cache',
+                  type = 'string', metavar = 'string',
+                  help = 'directory of grid cache [$XDG_CACHE_HOME/SphericalOrientations]')
+
+parser.add_option('--nocache',
+                  dest = 'nocache',
+                  action = 'store_true',
+                  help = 'neither read nor write grid cache [%default]')
+
+parser.add_option('--cachesize',
+                  dest = 'cachesize',
+                  type = 'float', metavar = 'float',
+                  help = 'maximum size of grid cache in MB [%default]')
+
 parser.add_option('--symm',
                   dest = 'symmetry',
                   type = 'string',
@@ -61,6 +86,16 @@ parser.add_option('--p3',
                   type = 'float', nargs = 3, metavar = 'float float float',
                   help = 'third point in the spherical triangle to be discretized [%default]')
 
+parser.add_option('--seed',
+                  dest = 'seed',
+                  type = 'choice', choices = ['triangle','laue','icosahedron'],
+                  help = 'discretize single triangle p1,p2,p3, all standard triangles of symmetry, or icosahedron faces [%default]')
+
+parser.add_option('-j', '--jobs',
+                  dest = 'jobs',
+                  type = 'int', metavar = 'int',
+                  help = 'number of triangles discretized in parallel [%default]')
+
 parser.add_option(      '--root',
                   dest = 'root',
                   type = 'string', metavar = 'string',
@@ -70,6 +105,11 @@ parser.set_defaults(degrees       = 3,
                     symmetry    = 'cubic',
                     unitcell    = False,
                     eulers      = False,
+                    dry         = False,
+                    seed        = 'triangle',
+                    jobs        = 1,
+                    nocache     = False,
+                    cachesize   = 256.,
                     point1      = [0., 0., 1.],
                     point2      = [1., 0., 1.],
                     point3      = [1., 1., 1.],
@@ -78,9 +118,12 @@ parser.set_defaults(degrees       = 3,
 (options,filenames) = parser.parse_args()
 options.root = os.path.dirname(os.path.realpath(__file__)) if options.root == None else options.root
 
-options.point1 = np.array(options.point1)/np.linalg.norm(options.point1)
-options.point2 = np.array(options.point2)/np.linalg.norm(options.point2)
-options.point3 = np.array(options.point3)/np.linalg.norm(options.point3)
+if options.gap    is not None and options.gap    <= 0.0: parser.error('angular gap needs to be positive.')
+if options.points is not None and options.points <  3:   parser.error('at least three points are needed.')
+if options.points is not None and options.seed != 'triangle':
+  parser.error('point budget only supported for single triangle.')
+if options.seed == 'laue' and options.symmetry not in Spherical.discretization.standardTriangles:
+  parser.error('unknown symmetry {}.'.format(options.symmetry))
 
 
 #----------------------------------------------#
@@ -191,86 +234,112 @@ def generate_tex_hexagonal(section):
 \\end{document}
 """
 
-#------------------------------------------------------#
-def append(vector):
-  color = np.array(([255,0,0]))
-  if np.linalg.norm(vector) != 0.0:
-    vector = vector/np.linalg.norm(vector)
-  zeta = math.degrees(math.atan2(vector[1],vector[0]))
-  eta  = math.degrees(math.acos(vector[2]))
-  phi1 = 270 + zeta
-  PHI  = eta
-  phi2 = 90 - zeta
-  if options.eulers == True:
-    listAngles.append(phi1)
-    listAngles.append(PHI)
-    listAngles.append(phi2)
-#   X = vector[0] * math.sqrt(1. /(1 + abs(vector[2])))                                     # homochoric projection
-#   Y = vector[1] * math.sqrt(1. /(1 + abs(vector[2])))
-  X = vector[0] /((1 + abs(vector[2])))                                                     # stereographic projection
-  Y = vector[1] /((1 + abs(vector[2])))
-  if [X,Y] not in listCoords:
-    listCoords.append([X,Y])
-    if options.unitcell == True :
-      if options.symmetry == 'tetragonal' :
-        cmd = '%s/unitcell.py -n "%s-%s-%s" -c 0.5456 --up 0 1 0 -e %.02f %.02f %.02f '%(options.root,str(int(phi1)),str(int(PHI)),str(int(phi2)),phi1,PHI,phi2)
-      elif options.symmetry == 'cubic' :
-        cmd = '%s/unitcell.py -n "%s-%s-%s" -c 1.0 --up 0 1 0 -e %.02f %.02f %.02f '%(options.root,str(int(phi1)),str(int(PHI)),str(int(phi2)),phi1,PHI,phi2)
-      elif options.symmetry == 'hexagonal' :
-        cmd = '%s/unitcell.py -u hexagonal -n "%s-%s-%s" --up 0 1 0 -e %.02f %.02f %.02f '%(options.root,str(int(phi1)),str(int(PHI)),str(int(phi2)),phi1,PHI,phi2)
-      call(cmd,shell=True)
-      out = '%s-%s-%s.pdf'%(str(int(phi1)),str(int(PHI)),str(int(phi2)))
-      texfile.write('\\node at (%.03f,%.03f){\includegraphics[scale=0.1]{%s}};\n'%(X,Y,out))
-    else :
-      texfile.write('\\node[fill={rgb:red,%.4f;green,%.4f;blue,%.4f}, circle, minimum height=4pt] at (%.4f, %.4f) {};\n'%(color[0]/255.0, color[1]/255.0, color[2]/255.0, X, Y))
-  return
-
-
-def mid(vector1,vector2):
-  mid1 = np.array(([(vector1[0] + vector2[0])/2 ,(vector1[1] + vector2[1])/2 ,(vector1[2] + vector2[2])/2 ]))
-  append(mid1)
-  return mid1
+def generate_tex_sphere(section):
 
-#        Using Sierpenski triangle algorithm and modifying it             #
+   if section == 'header' :
+     return """
+\\documentclass{article}
+\\usepackage{tikz}
+\\graphicspath{{../}{./}}
+\\usetikzlibrary{shapes,arrows}
+\\usepackage[graphics, active, tightpage]{preview}
+\\PreviewEnvironment{tikzpicture}
+\\begin{document}
+\\thispagestyle{empty}
+\\begin{tikzpicture}
+\\begin{scope}[x=6cm,y=6cm]
+\\draw[line width=1.0pt] (0,0) circle (1);
+\\draw[line width=1.0pt] (2.4,0) circle (1);
+\\node[below] at (0,-1) {\\small upper hemisphere};
+\\node[below] at (2.4,-1) {\\small lower hemisphere};
+\\begin{scope}[inner sep=1.0pt]
+"""
+   elif section == 'footer' :
+     return generate_tex_tetragonal('footer')
 
-def sierpenski(vector,degree):
-  if degree > 0:
-    sierpenski([vector[0],mid(vector[0],vector[1]),mid(vector[0],vector[2])],degree - 1)
-    sierpenski([vector[1],mid(vector[0],vector[1]),mid(vector[1],vector[2])],degree - 1)
-    sierpenski([vector[2],mid(vector[2],vector[1]),mid(vector[0],vector[2])],degree - 1)
-    sierpenski([mid(vector[0],vector[1]),mid(vector[0],vector[2]),mid(vector[1],vector[2])],degree - 1)
+#------------------------------------------------------#
+def unitcell(angles,X,Y):
+  phi1,PHI,phi2 = angles
+  if options.symmetry == 'tetragonal' :
+    cmd = '%s/unitcell.py -n "%s-%s-%s" -c 0.5456 --up 0 1 0 -e %.02f %.02f %.02f '%(options.root,str(int(phi1)),str(int(PHI)),str(int(phi2)),phi1,PHI,phi2)
+  elif options.symmetry == 'cubic' :
+    cmd = '%s/unitcell.py -n "%s-%s-%s" -c 1.0 --up 0 1 0 -e %.02f %.02f %.02f '%(options.root,str(int(phi1)),str(int(PHI)),str(int(phi2)),phi1,PHI,phi2)
+  elif options.symmetry == 'hexagonal' :
+    cmd = '%s/unitcell.py -u hexagonal -n "%s-%s-%s" --up 0 1 0 -e %.02f %.02f %.02f '%(options.root,str(int(phi1)),str(int(PHI)),str(int(phi2)),phi1,PHI,phi2)
+  call(cmd,shell=True)
+  out = '%s-%s-%s.pdf'%(str(int(phi1)),str(int(PHI)),str(int(phi2)))
+  texfile.write('\\node at (%.03f,%.03f){\includegraphics[scale=0.1]{%s}};\n'%(X,Y,out))
   return
 
+if options.seed == 'triangle':
+  triangles = [options.point1,options.point2,options.point3]
+elif options.seed == 'laue':
+  triangles = Spherical.discretization.laueTriangles(options.symmetry)
+elif options.seed == 'icosahedron':
+  triangles = Spherical.discretization.icosahedron()
+
+cache  = None if options.nocache else Spherical.discretization.GridCache(options.cache,int(options.cachesize*2**20))
+key    = None if options.nocache else cache.key(triangles,options.degrees,options.gap,options.points,options.symmetry)
+arrays = None if options.nocache else cache.load(key)
+
+gap = options.gap
+if arrays is not None:
+  count = len(arrays[0])
+elif options.seed == 'triangle':
+  if options.points is not None:                                                                    # point budget translates into largest gap meeting it
+    gap = Spherical.discretization.budgetGap(Spherical.discretization.triangle(*triangles),options.points)
+  count = Spherical.discretization.gridSize(options.point1,options.point2,options.point3,options.degrees,gap)
+else:
+  count = Spherical.discretization.sphereSize(triangles,options.degrees,gap)
+Spherical.util.croak('{} orientations, about {:.1f} MB of arrays and {:.1f} MB of output.'
+                     .format(count,count*8*8/2.**20,count*(92 + (55 if options.eulers else 0))/2.**20))
+if options.dry: sys.exit()
+
+if arrays is None:
+  if options.seed == 'triangle':
+    directions = Spherical.discretization.grid(options.point1,options.point2,options.point3,options.degrees,gap)
+  else:
+    directions = Spherical.discretization.sphere(triangles,options.degrees,gap,options.jobs)
+  arrays = (directions,
+            Spherical.discretization.stereographic(directions),
+            Spherical.discretization.eulers(directions))
+  if not options.nocache: cache.store(key,arrays)
+directions,projection,angles = arrays
 
 if not os.path.exists('equidistant'): os.makedirs('equidistant')
 
 
 texfile = open("equidistant/equidistant_IPF.tex", 'w')
-if options.symmetry == 'tetragonal':
+nodes,nodeAngles = projection,angles
+if options.seed != 'triangle':                                                                      # hemispheres side by side, as projection folds them
+  texfile.write(generate_tex_sphere('header'))
+  upper,lower = np.where(directions[:,2] >= -1e-12)[0],np.where(directions[:,2] <= 1e-12)[0]           # equator on both
+  nodes      = np.vstack((projection[upper],projection[lower] + [2.4,0.0]))
+  nodeAngles = np.vstack((angles[upper],angles[lower]))
+elif options.symmetry == 'tetragonal':
   texfile.write(generate_tex_tetragonal('header'))
 elif options.symmetry == 'cubic':
   texfile.write(generate_tex_cubic('header'))
 elif options.symmetry == 'hexagonal':
   texfile.write(generate_tex_hexagonal('header'))
-vector = np.array((options.point1,options.point2,options.point3))
-append(vector[0])
-append(vector[1])
-append(vector[2])
-sierpenski(vector,options.degrees)
+X,Y = nodes.T
+if options.unitcell == True :
+  for i in xrange(len(nodes)):
+    unitcell(nodeAngles[i],X[i],Y[i])
+else :
+  color = np.array(([255,0,0]))
+  node  = '\\node[fill={rgb:red,%.4f;green,%.4f;blue,%.4f}, circle, minimum height=4pt] at '%(color[0]/255.0, color[1]/255.0, color[2]/255.0)
+  texfile.write((node + '(%.4f, %.4f) {};\n')*len(nodes)%tuple(nodes.ravel().tolist()))
 texfile.write(generate_tex_tetragonal('footer'))
 texfile.close()
 
 if options.eulers:
-  listAngles = np.array(listAngles).reshape(len(listAngles)/3,3)
-  sorted_idx = np.lexsort(listAngles.T)
-  sorted_data =  listAngles[sorted_idx,:]
+  sorted_idx = np.lexsort(angles.T)
+  sorted_data =  angles[sorted_idx,:]
 
   # Get unique row mask
   row_mask = np.append([True],np.any(np.diff(sorted_data,axis=0),1))
 
   # Get unique rows
   uniqueAngles = sorted_data[row_mask]
-  for i in xrange(len(uniqueAngles)):
-    print uniqueAngles[i,0],uniqueAngles[i,1],uniqueAngles[i,2]
-    
-    
\ No newline at end of file
+  sys.stdout.write('%r %r %r\n'*len(uniqueAngles)%tuple(uniqueAngles.ravel().tolist()))